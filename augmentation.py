@@ -0,0 +1,70 @@
+# Import libraries
+import argparse
+import features
+import numpy as np
+import os
+import pandas as pd
+from dataset_writer import SampleWriter
+
+# Function to create new samples from normalized features with jitter, scale, rotation and mirroring
+def augment(samples, copies=10, feature_set=features.DEFAULT_FEATURES, jitter=0.03,
+            scale_range=(0.9, 1.1), max_rotation_degrees=12.0, mirror_probability=0.5, seed=None):
+    rng = np.random.default_rng(seed)
+    dims = 3 if feature_set.use_z else 2
+
+    # Every sample is repeated once per copy, shape (n_samples * copies, n_points, dims)
+    samples = np.asarray(samples, dtype=np.float64)
+    points = np.tile(samples.reshape(len(samples), -1, dims), (copies, 1, 1))
+    n_augmented = len(points)
+
+    # Rotation around the origin point, only on the image plane
+    angles = np.radians(rng.uniform(-max_rotation_degrees, max_rotation_degrees, n_augmented))
+    cos, sin = np.cos(angles)[:, None], np.sin(angles)[:, None]
+    x, y = points[:, :, 0].copy(), points[:, :, 1].copy()
+    points[:, :, 0] = x * cos - y * sin
+    points[:, :, 1] = x * sin + y * cos
+
+    # Scale and random noise on every coordinate
+    points *= rng.uniform(scale_range[0], scale_range[1], (n_augmented, 1, 1))
+    points += rng.normal(0.0, jitter, points.shape)
+
+    # Mirror the x axis to simulate the other hand
+    mirrored = rng.random(n_augmented) < mirror_probability
+    points[mirrored, :, 0] *= -1
+
+    # The origin point must stay at zero like in the real samples
+    if feature_set.origin in feature_set.points:
+        origin = feature_set.points.index(feature_set.origin)
+        points -= points[:, origin:origin + 1, :]
+
+    return points.reshape(n_augmented, -1)
+
+# Function to augment a label file and save the new samples in another file
+def augment_file(input_path, output_path, copies=10, feature_set=features.DEFAULT_FEATURES, seed=None):
+    data = pd.read_csv(input_path)
+    samples = data[feature_set.columns].to_numpy()
+    labels = data["label"].to_numpy()
+
+    augmented = augment(samples, copies, feature_set, seed=seed)
+    augmented_labels = np.tile(labels, copies)
+
+    # The augmented file is always created again from the original samples
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    with SampleWriter(output_path, feature_set.columns + ["label"], batch_size=4096) as writer:
+        writer.extend(augmented, augmented_labels)
+    return len(augmented)
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create augmented samples from label files.")
+    parser.add_argument("files", nargs="+", help="Label files, e.g. datasets/NUMBER_1.csv")
+    parser.add_argument("--copies", type=int, default=10, help="New samples created for every sample")
+    parser.add_argument("--output-dir", default=os.path.join(os.getcwd(), "datasets", "augmented"))
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    for input_path in args.files:
+        output_path = os.path.join(args.output_dir, os.path.basename(input_path))
+        count = augment_file(input_path, output_path, args.copies, seed=args.seed)
+        print(f"{count} augmented samples saved on: {output_path}")
@@ -0,0 +1,212 @@
+# Import libraries
+import argparse
+import esp32_simulator
+import features
+import inference
+import json
+import numpy as np
+import os
+import platform
+import preprocess
+import requests
+import subprocess
+import time
+
+# Folder where the baselines are saved
+BASELINES_FOLDER = "benchmarks"
+
+# Object with the same shape as a MediaPipe landmark list
+class FakeHandLandmarks:
+    class Point:
+        __slots__ = ("x", "y", "z")
+
+        def __init__(self, x, y, z):
+            self.x, self.y, self.z = x, y, z
+
+    def __init__(self, landmarks):
+        self.landmark = [self.Point(*map(float, point)) for point in landmarks]
+
+# Function to run one stage and measure every call
+def run_stage(function, inputs, warmup=20):
+    for item in inputs[:warmup]:
+        function(item)
+
+    times = np.empty(len(inputs))
+    total_start = time.perf_counter()
+    for index, item in enumerate(inputs):
+        start = time.perf_counter()
+        function(item)
+        times[index] = time.perf_counter() - start
+    total = time.perf_counter() - total_start
+
+    return {
+        "ops_per_second": len(inputs) / total,
+        "p50_us": float(np.percentile(times, 50) * 1e6),
+        "p99_us": float(np.percentile(times, 99) * 1e6),
+        "samples": len(inputs)
+    }
+
+# Function to build the inputs and run every stage
+def run_benchmarks(dataset_path, samples, seed=0, include_mediapipe=True, video_path=None):
+    rng = np.random.default_rng(seed)
+    results = {}
+
+    # Rows of the dataset, repeated if the dataset is smaller than the number of samples
+    import pandas as pd
+    rows = pd.read_csv(dataset_path)[features.FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    rows = rows[rng.integers(0, len(rows), samples)]
+
+    # Synthetic hands around a plausible position of the frame
+    landmark_arrays = 0.5 + rng.normal(0.0, 0.1, (samples, features.NUM_LANDMARKS, 3))
+    hand_landmarks = [FakeHandLandmarks(landmarks) for landmarks in landmark_arrays]
+
+    # Feature normalization
+    feature_set = features.DEFAULT_FEATURES
+    vector = np.empty(feature_set.n_features)
+    results["features"] = run_stage(lambda landmarks: feature_set.compute(landmarks, out=vector), landmark_arrays)
+
+    # MediaPipe landmark list to array
+    array = np.empty((features.NUM_LANDMARKS, 3))
+    results["landmarks_to_array"] = run_stage(lambda hand: features.landmarks_to_array(hand, out=array), hand_landmarks)
+
+    # Model prediction with every model file available
+    classifiers = {}
+    for model_path in ["gesture_model.joblib", "gesture_model.npz"]:
+        if os.path.exists(model_path):
+            classifiers[os.path.splitext(model_path)[1][1:]] = inference.load_classifier(model_path)
+    for name, classifier in classifiers.items():
+        results[f"predict_{name}"] = run_stage(classifier.predict, rows)
+
+        # Best of a few runs, a single batch call is too short to time once
+        batch_time = float("inf")
+        for _ in range(5):
+            batch_start = time.perf_counter()
+            classifier.predict_batch(rows)
+            batch_time = min(batch_time, time.perf_counter() - batch_start)
+        results[f"predict_batch_{name}"] = {"ops_per_second": samples / batch_time, "samples": samples}
+
+    # Full landmark path: MediaPipe list -> features -> prediction
+    if classifiers:
+        classifier = classifiers.get("npz") or classifiers["joblib"]
+
+        def landmark_path(hand):
+            features.landmarks_to_array(hand, out=array)
+            feature_set.compute(array, out=vector)
+            return classifier.predict(vector)
+        results["landmark_path"] = run_stage(landmark_path, hand_landmarks)
+
+    # Color encoding
+    colors = rng.integers(0, 256, (samples, 3))
+    results["color_encode"] = run_stage(lambda rgb: f"#{rgb[0]:02X}{rgb[1]:02X}{rgb[2]:02X}", colors)
+
+    # Sending against a simulated ESP32 with a keep-alive session
+    board = esp32_simulator.SimulatedBoard().start()
+    session = requests.Session()
+    url = board.url
+    hex_colors = [f"#{r:02X}{g:02X}{b:02X}" for r, g, b in colors[:min(samples, 500)]]
+    results["send_http"] = run_stage(lambda color: session.post(url, data=color, timeout=1.0), hex_colors)
+    session.close()
+    board.stop()
+
+    # Frame preprocessing at 1080p, new arrays on every frame against reused buffers (both flip and convert)
+    # The last stage skips the flip and mirrors the landmarks instead, as the camera workers do
+    import cv2
+    frames_1080p = [rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8) for _ in range(4)] * 25
+    results["preprocess_alloc"] = run_stage(
+        lambda frame: cv2.cvtColor(cv2.flip(frame, 1), cv2.COLOR_BGR2RGB), frames_1080p, warmup=5)
+    results["preprocess_reuse"] = run_stage(
+        preprocess.FramePreprocessor(flip_image=True).process, frames_1080p, warmup=5)
+    results["preprocess_noflip"] = run_stage(
+        preprocess.FramePreprocessor(flip_image=False).process, frames_1080p, warmup=5)
+
+    # MediaPipe on recorded or synthetic frames, only if it is installed
+    if include_mediapipe:
+        try:
+            import mediapipe as mp
+            hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1)
+            frames = load_frames(video_path, min(samples, 100), rng)
+            results["hands_process"] = run_stage(hands.process, frames, warmup=5)
+            hands.close()
+        except ImportError:
+            print("MediaPipe is not installed, skipping the 'hands_process' stage.")
+
+    return results
+
+# Function to read RGB frames from a recorded video, or create random ones if there is no video
+def load_frames(video_path, count, rng):
+    if video_path is None:
+        return [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(count)]
+
+    import cv2
+    frames = []
+    cap = cv2.VideoCapture(video_path)
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    cap.release()
+    return frames
+
+# Information of the machine saved with every baseline
+def environment_info():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count()
+    }
+
+# Function to print the results, and the change against a baseline if there is one
+def print_results(results, baseline=None, threshold=0.15):
+    regressions = []
+    print(f"{'Stage':<24}{'ops/s':>14}{'p50 us':>12}{'p99 us':>12}{'vs baseline':>14}")
+    for stage, values in results.items():
+        line = f"{stage:<24}{values['ops_per_second']:>14.0f}"
+        line += f"{values['p50_us']:>12.1f}{values['p99_us']:>12.1f}" if "p50_us" in values else " " * 24
+
+        # Change of the throughput, negative is slower
+        if baseline and stage in baseline:
+            change = values["ops_per_second"] / baseline[stage]["ops_per_second"] - 1
+            line += f"{change * 100:>+13.1f}%"
+            if change < -threshold:
+                regressions.append(stage)
+        print(line)
+    return regressions
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the stages of the gesture pipeline.")
+    parser.add_argument("--dataset", default="gestures_dataset.csv")
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", metavar="NAME", help=f"Save the results as a baseline in '{BASELINES_FOLDER}/'")
+    parser.add_argument("--compare", metavar="NAME", help="Compare the results with a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Throughput loss reported as a regression")
+    parser.add_argument("--video", help="Recorded video used for the MediaPipe stage instead of random frames")
+    parser.add_argument("--no-mediapipe", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.dataset, args.samples, args.seed, not args.no_mediapipe, args.video)
+
+    baseline = None
+    if args.compare:
+        with open(os.path.join(BASELINES_FOLDER, args.compare + ".json")) as handle:
+            baseline = json.load(handle)["results"]
+    regressions = print_results(results, baseline, args.threshold)
+
+    if args.save:
+        os.makedirs(BASELINES_FOLDER, exist_ok=True)
+        path = os.path.join(BASELINES_FOLDER, args.save + ".json")
+        with open(path, "w") as handle:
+            json.dump({"environment": environment_info(), "samples": args.samples, "results": results}, handle, indent=2)
+        print(f"Baseline saved on: {path}")
+
+    if regressions:
+        print(f"Regressions over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        exit(1)
@@ -5,101 +5,178 @@ import os
 import re
 import platform
 import subprocess
+import threading
+import time
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+# Inventory saved by the last discovery, used while the connected devices do not change
+CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "lightsign", "cameras.json")
+SYSFS_VIDEO_PATH = "/sys/class/video4linux"
+
+# Function to read the Linux camera names from sysfs in one pass, without a subprocess per index
+def get_linux_camera_names() -> Dict[int, str]:
+    names = {}
+    if not os.path.isdir(SYSFS_VIDEO_PATH):
+        return names
+
+    for device in os.listdir(SYSFS_VIDEO_PATH):
+        match = re.fullmatch(r"video(\d+)", device)
+        if not match:
+            continue
+        device_path = os.path.join(SYSFS_VIDEO_PATH, device)
+        try:
+            # Every camera also creates metadata nodes, only the first node (index 0) captures video
+            index_path = os.path.join(device_path, "index")
+            if os.path.exists(index_path):
+                with open(index_path) as handle:
+                    if handle.read().strip() != "0":
+                        continue
+            with open(os.path.join(device_path, "name")) as handle:
+                names[int(match.group(1))] = handle.read().strip()
+        except OSError:
+            continue
+    return names
+
+# Function to get the macOS camera names, the command runs only once
+def get_macos_camera_names() -> List[str]:
+    try:
+        # Get camera information
+        result = subprocess.run(
+            ['system_profiler', 'SPCameraDataType', '-json'],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+
+        # Convert result to JSON and get camera names
+        camera_data = json.loads(result.stdout)
+        return [item['_name'] for item in camera_data.get('SPCameraDataType', []) if '_name' in item]
+    except Exception as e:
+        print(f"Error trying to get camera from macOS: {str(e)}")
+
+    # Try another method
+    try:
+        result = subprocess.run(
+            ['ioreg', '-r', '-c', 'IOUSBDevice'],
+            capture_output=True,
+            text=True,
+            timeout=5
+        )
+        return re.findall(r'"USB Camera" = "([^"]+)"', result.stdout)
+    except:
+        return []
+
+# Function to open one camera, returns its name or None if it can not be opened
+def probe_camera(index: int) -> Optional[str]:
+    cap = None
+    try:
+        # Try to open the camera with different backends
+        if platform.system() == 'Windows':
+            cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
+        else:
+            cap = cv2.VideoCapture(index)
+
+        if not cap.isOpened():
+            return None
+
+        # Default name
+        camera_name = f"Camera {index}"
+        if platform.system() == 'Windows':
+            try:
+                # Try to get device name through DirectShow
+                _, filename = os.path.split(cap.getBackendName())
+                camera_name = re.sub(r'_vid.*', '', filename, flags=re.I)
+            except:
+                pass
+        return camera_name
+    except:
+        return None
+    finally:
+        if cap is not None:
+            cap.release()
+
+# Function to open several cameras at the same time, a camera that does not answer in time is skipped
+def probe_cameras(indexes: List[int], timeout: float) -> Dict[int, str]:
+    found = {}
+    lock = threading.Lock()
+
+    def probe(index):
+        name = probe_camera(index)
+        if name is not None:
+            with lock:
+                found[index] = name
+
+    threads = [threading.Thread(target=probe, args=(index,), daemon=True) for index in indexes]
+    for thread in threads:
+        thread.start()
+
+    # One deadline for every probe, so a few hung cameras do not add up their timeouts
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    with lock:
+        return dict(found)
+
+# Function to get a signature of the connected devices, None when the platform has no cheap way to list them
+def get_device_signature(linux_names: Dict[int, str]) -> Optional[str]:
+    if platform.system() != 'Linux' or not linux_names:
+        return None
+    return json.dumps(sorted(linux_names.items()))
+
+# Functions to read and save the cached inventory
+def load_cached_cameras(signature: str) -> Optional[List[Tuple[int, str]]]:
+    try:
+        with open(CACHE_FILE) as handle:
+            cache = json.load(handle)
+        if cache.get("signature") == signature:
+            return [(index, name) for index, name in cache["cameras"]]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None
+
+def save_cached_cameras(signature: str, camera_info: List[Tuple[int, str]]) -> None:
+    try:
+        os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+        with open(CACHE_FILE, "w") as handle:
+            json.dump({"signature": signature, "cameras": camera_info}, handle)
+    except OSError:
+        pass
 
 # Function to get the camera information
-def get_camera_info() -> List[Tuple[int, str]]:
-    # Array to save the camera information using and index and the name of the camera
+def get_camera_info(max_cameras: int = 3, timeout: float = 3.0, use_cache: bool = True) -> List[Tuple[int, str]]:
+    # Linux lists its devices in sysfs, other systems check the first indexes
+    linux_names = get_linux_camera_names() if platform.system() == 'Linux' else {}
+    if linux_names:
+        indexes = sorted(linux_names)[:10]
+    else:
+        indexes = list(range(max_cameras))
+
+    # Skip probing if the connected devices are the same as in the last launch
+    signature = get_device_signature(linux_names)
+    if use_cache and signature is not None:
+        cached = load_cached_cameras(signature)
+        if cached is not None:
+            return cached
+
+    # Open every camera at the same time
+    found = probe_cameras(indexes, timeout)
+
+    # Platform-specific names
+    macos_names = get_macos_camera_names() if platform.system() == 'Darwin' and found else []
     camera_info = []
-    max_cameras = 3
-    
-    # Loop to check a maximum of 3 cameras
-    for index in range(max_cameras):
-        cap = None
-        try:
-            # Try to open the camera with different backends
-            if platform.system() == 'Windows':
-                cap = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-            else:
-                cap = cv2.VideoCapture(index)
-            
-            if cap.isOpened():
-                # Default name
-                camera_name = f"Camera {index}"
-                
-                # Platform-specific name detection
-                if platform.system() == 'Windows':
-                    try:
-                        # Try to get device name through DirectShow
-                        _, filename = os.path.split(cap.getBackendName())
-                        camera_name = re.sub(r'_vid.*', '', filename, flags=re.I)
-                    except:
-                        pass
-                
-                # Linux
-                elif platform.system() == 'Linux':
-                    try:
-                        # Use v4l2-ctl on Linux
-                        result = subprocess.run(
-                            ['v4l2-ctl', '--list-devices'],
-                            capture_output=True,
-                            text=True
-                        )
-                        lines = result.stdout.split('\n')
-                        for i, line in enumerate(lines):
-                            if f'/dev/video{index}' in line:
-                                camera_name = lines[i-1].strip()
-                                break
-                    except:
-                        pass
-                
-                # MacOs
-                elif platform.system() == 'Darwin': 
-                    try:
-                        # Get camera information
-                        result = subprocess.run(
-                            ['system_profiler', 'SPCameraDataType', '-json'],
-                            capture_output=True,
-                            text=True
-                        )
-                        
-                        # Convert result to JSON
-                        camera_data = json.loads(result.stdout)
-                        
-                        # Get camera name
-                        if 'SPCameraDataType' in camera_data:
-                            cameras = []
-                            for item in camera_data['SPCameraDataType']:
-                                if '_name' in item:
-                                    cameras.append(item['_name'])
-                            
-                            if index < len(cameras):
-                                camera_name = cameras[index]
-                                
-                    except Exception as e:
-                        print(f"Error trying to get camera from macOS: {str(e)}")
-
-                        # Try another method
-                        try:
-                            result = subprocess.run(
-                                ['ioreg', '-r', '-c', 'IOUSBDevice'],
-                                capture_output=True,
-                                text=True
-                            )
-                            usb_cameras = re.findall(r'"USB Camera" = "([^"]+)"', result.stdout)
-                            if usb_cameras and index < len(usb_cameras):
-                                camera_name = usb_cameras[index]
-                        except:
-                            pass
-                
-                # Add camera info
-                camera_info.append((index, camera_name))
-                
-        finally:
-            if cap is not None:
-                cap.release()
-    
+    for index in sorted(found):
+        camera_name = found[index]
+        if index in linux_names:
+            camera_name = linux_names[index]
+        elif index < len(macos_names):
+            camera_name = macos_names[index]
+        camera_info.append((index, camera_name))
+
+    # Only a complete inventory is saved, a camera that was busy or slow this time must be probed again next time
+    if signature is not None and camera_info and len(found) == len(indexes):
+        save_cached_cameras(signature, camera_info)
     return camera_info
 
 def show_camera_selection(cameras: List[Tuple[int, str]]) -> int:
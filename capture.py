@@ -0,0 +1,114 @@
+# Import libraries
+import cv2
+import threading
+import time
+
+# Class that reads the camera on its own thread and only keeps the newest frame
+class FrameGrabber:
+    def __init__(self, camera_index, api_preference=cv2.CAP_ANY):
+        # Open the camera and ask the driver to keep its own buffer as small as possible
+        self.cap = cv2.VideoCapture(camera_index, api_preference)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        # Latest-frame slot shared between the reader thread and the consumer
+        self._condition = threading.Condition()
+        self._frame = None
+        self._frame_time = 0.0
+        self._frame_id = 0
+        self._consumed_id = 0
+        self._running = False
+        self._ended = False
+        self._thread = None
+
+        # Counters
+        self.frames_read = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.last_capture_time = 0.0
+        self.last_queue_age = 0.0
+        self.max_queue_age = 0.0
+        self._total_queue_age = 0.0
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    # True when the camera stopped giving frames
+    @property
+    def ended(self):
+        return self._ended
+
+    # Start the reader thread
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._reader, name="FrameGrabber", daemon=True)
+        self._thread.start()
+        return self
+
+    # Reader loop, replaces the slot content with every new frame
+    def _reader(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            now = time.perf_counter()
+
+            with self._condition:
+                if not ret:
+                    # Camera closed or unplugged
+                    self._ended = True
+                    self._condition.notify_all()
+                    break
+
+                # The previous frame was never consumed, so it is dropped
+                if self._frame_id > self._consumed_id:
+                    self.frames_dropped += 1
+
+                self._frame = frame
+                self._frame_time = now
+                self._frame_id += 1
+                self.frames_read += 1
+                self._condition.notify_all()
+
+        self._running = False
+
+    # Wait for a frame newer than the last one returned, same result format as cv2.VideoCapture.read
+    def read(self, timeout=1.0):
+        with self._condition:
+            has_frame = self._condition.wait_for(
+                lambda: self._frame_id > self._consumed_id or self._ended,
+                timeout=timeout
+            )
+            if not has_frame or self._frame_id == self._consumed_id:
+                return False, None
+
+            # Take ownership of the frame and save how long it waited in the slot
+            frame = self._frame
+            self._consumed_id = self._frame_id
+            self.last_capture_time = self._frame_time
+
+        queue_age = time.perf_counter() - self.last_capture_time
+        self.frames_delivered += 1
+        self.last_queue_age = queue_age
+        self.max_queue_age = max(self.max_queue_age, queue_age)
+        self._total_queue_age += queue_age
+        return True, frame
+
+    # Get the counters of the capture stage
+    def stats(self):
+        delivered = self.frames_delivered
+        return {
+            "frames_read": self.frames_read,
+            "frames_delivered": delivered,
+            "frames_dropped": self.frames_dropped,
+            "last_queue_age_ms": self.last_queue_age * 1000,
+            "avg_queue_age_ms": (self._total_queue_age / delivered * 1000) if delivered else 0.0,
+            "max_queue_age_ms": self.max_queue_age * 1000
+        }
+
+    # Stop the reader thread and release the camera
+    def release(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.cap.release()
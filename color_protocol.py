@@ -0,0 +1,152 @@
+# Import libraries
+import socket
+import struct
+import threading
+import time
+
+# Binary color datagram: magic "LS", version, sequence number (uint32, big endian), red, green, blue
+MAGIC = b"LS"
+VERSION = 1
+PACKET = struct.Struct("!2sBIBBB")
+PACKET_SIZE = PACKET.size
+DEFAULT_PORT = 4210
+
+# After this many seconds without packets the receiver accepts any sequence (the sender may have restarted)
+SEQUENCE_RESET_SECONDS = 2.0
+
+# Function to convert "#RRGGBB" to (r, g, b)
+def hex_to_rgb(hex_color):
+    if not hex_color.startswith("#") or len(hex_color) != 7:
+        raise ValueError(f"Invalid color '{hex_color}', expected #RRGGBB.")
+    value = int(hex_color[1:], 16)
+    return value >> 16, (value >> 8) & 0xFF, value & 0xFF
+
+# Function to build one datagram
+def encode_color(sequence, rgb):
+    red, green, blue = rgb
+    return PACKET.pack(MAGIC, VERSION, sequence & 0xFFFFFFFF, red, green, blue)
+
+# Function to read one datagram, returns (sequence, (r, g, b))
+def decode_color(packet):
+    if len(packet) != PACKET_SIZE:
+        raise ValueError(f"Invalid packet size {len(packet)}, expected {PACKET_SIZE}.")
+    magic, version, sequence, red, green, blue = PACKET.unpack(packet)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Invalid packet header.")
+    return sequence, (red, green, blue)
+
+# Function to compare sequence numbers that wrap around after 2^32
+def is_newer(sequence, last_sequence):
+    difference = (sequence - last_sequence) & 0xFFFFFFFF
+    return 0 < difference < 0x80000000
+
+# Class that drops duplicated and out of order packets, same logic as rgb_controller/src/main.cpp
+class SequenceFilter:
+    def __init__(self, reset_seconds=SEQUENCE_RESET_SECONDS):
+        self.reset_seconds = reset_seconds
+        self.last_sequence = None
+        self.last_source = None
+        self.last_time = 0.0
+
+    # Check if the packet must be applied, and save it as the latest
+    def accept(self, sequence, source=None, now=None):
+        now = time.monotonic() if now is None else now
+        restarted = (self.last_sequence is None or source != self.last_source
+                     or now - self.last_time > self.reset_seconds)
+        if not restarted and not is_newer(sequence, self.last_sequence):
+            return False
+        self.last_sequence = sequence
+        self.last_source = source
+        self.last_time = now
+        return True
+
+# Class that sends colors to the ESP32 as UDP datagrams, same API as sender.ColorSender
+# A datagram costs one system call and never waits for an answer, so send() does not need a queue
+# Colors are only sent when they change, so a thread repeats the latest datagram every repeat_interval seconds:
+# a lost datagram is fixed by the next copy and the receiver ignores the copies of a color it already applied
+class UdpColorSender:
+    def __init__(self, host, port=DEFAULT_PORT, repeat_interval=0.1, repeat_on_close=3):
+        self.address = (host, port)
+        self.repeat_interval = repeat_interval
+        self.repeat_on_close = repeat_on_close
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.sequence = 0
+        self._last_packet = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Counters
+        self.is_connected = True
+        self.sent = 0
+        self.failed = 0
+        self.repeats = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self._total_latency = 0.0
+
+    # Send a color, returns immediately
+    def send(self, hex_color):
+        self.sequence = (self.sequence + 1) & 0xFFFFFFFF
+        packet = encode_color(self.sequence, hex_to_rgb(hex_color))
+
+        # Also repeated when this send fails, so the color arrives once the network is back
+        self._last_packet = packet
+        if self._thread is None and self.repeat_interval:
+            self._thread = threading.Thread(target=self._repeat, name="UdpColorSender", daemon=True)
+            self._thread.start()
+
+        start = time.perf_counter()
+        try:
+            self.socket.sendto(packet, self.address)
+        except OSError as e:
+            self.failed += 1
+            if self.is_connected:
+                print(f"Error while sending the color '{hex_color}' to {self.address[0]}: {e}")
+            self.is_connected = False
+            return
+
+        latency = time.perf_counter() - start
+        if not self.is_connected:
+            print("Connection with ESP32 restored.")
+        self.is_connected = True
+        self.sent += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self._total_latency += latency
+
+    # Send the latest datagram again with the same sequence number
+    def _repeat(self):
+        while not self._stop_event.wait(self.repeat_interval):
+            try:
+                self.socket.sendto(self._last_packet, self.address)
+                self.repeats += 1
+            except OSError:
+                pass
+
+    # Latency is the time of the send call, the receiver does not answer
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "coalesced": 0,
+            "connected": self.is_connected,
+            "repeats": self.repeats,
+            "last_latency_ms": self.last_latency * 1000,
+            "avg_latency_ms": (self._total_latency / self.sent * 1000) if self.sent else 0.0,
+            "max_latency_ms": self.max_latency * 1000
+        }
+
+    # Datagrams can be lost, repeat the last one (the receiver ignores the copies that arrive)
+    def close(self, timeout=1.0):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        if self._last_packet is not None:
+            for _ in range(self.repeat_on_close):
+                try:
+                    self.socket.sendto(self._last_packet, self.address)
+                except OSError:
+                    break
+        self.socket.close()
@@ -1,14 +1,13 @@
 # Import libraries
+import augmentation
 import camera
 import cv2
-import math
+import features
 import os
+import preprocess
+import time
 import mediapipe as mp
-import pandas as pd
-
-# Function to normalize the distance between to points
-def distance(p1, p2):
-    return math.sqrt((p1.x - p2.x)**2 + (p1.y - p2.y)**2)
+from dataset_writer import SampleWriter
 
 # Main code
 if __name__ == "__main__":
@@ -23,25 +22,39 @@ if __name__ == "__main__":
     cap = cv2.VideoCapture(camera_index, cv2.CAP_ANY)
 
     # Dataset columns
-    columns = [
-        "WRIST_X", "WRIST_Y",
-        "THUMB_TIP_X", "THUMB_TIP_Y",
-        "INDEX_TIP_X", "INDEX_TIP_Y",
-        "MIDDLE_TIP_X", "MIDDLE_TIP_Y",
-        "label"
-    ]
-    data = pd.DataFrame(columns=columns)
+    feature_set = features.DEFAULT_FEATURES
+    columns = feature_set.columns + ["label"]
     current_label = "TESTING"
 
+    # Burst mode, every detected frame is saved while the "R" key is held down.
+    # The key repeats while it is held, so recording stops when no repeat arrives for this time
+    # It must be longer than the delay before the first repeat (660 ms on X11, up to 1 s on Windows)
+    BURST_HOLD_SECONDS = 1.1
+    burst_until = 0.0
+
+    # Augmented samples created for every recorded sample when the program ends (0 to disable)
+    AUGMENT_COPIES = 0
+
+    # Samples are written to 'datasets/<label>.csv' while recording, continuing the existing file
+    dataset_folder = os.path.join(os.getcwd(), "datasets")
+    file_path = os.path.join(dataset_folder, current_label + ".csv")
+    writer = SampleWriter(file_path, columns)
+    print(f"Recording on: {file_path} ({writer.existing_rows} samples already saved)")
+
+    # Mirrored frame and RGB buffers reused on every frame
+    preprocessor = preprocess.FramePreprocessor(flip_image=True)
+
     # Loop to read hands
     while True:
         ret, frame = cap.read()
         if not ret:
             break
 
+        # Features of the current frame, only if a hand is detected
+        normalized_points = None
+
         # Get frame and hands results from MediaPipe
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame, frame_rgb = preprocessor.process(frame)
         results = hands.process(frame_rgb)
 
         # It is detecting the hands
@@ -56,73 +69,57 @@ if __name__ == "__main__":
                     mp_drawing.DrawingSpec(color=(255, 255, 255), thickness=1)
                 )
 
-                # Get key points
-                points = {
-                    'WRIST': hand_landmarks.landmark[0],
-                    'THUMB_TIP': hand_landmarks.landmark[4],
-                    'INDEX_TIP': hand_landmarks.landmark[8],
-                    'MIDDLE_TIP': hand_landmarks.landmark[12],
-                    'MIDDLE_MCP': hand_landmarks.landmark[9] # Extra point to scale
-                }
-
-                # Normalization using the WRIST and MIDDLE_MCP
-                wrist = points['WRIST']
-                middle_mcp = points['MIDDLE_MCP']
-                normalized_distance = distance(wrist, middle_mcp)
-
-                # Do not try to divide by zero
-                if normalized_distance == 0:
-                    normalized_distance = 1e-6
-
-                # Get normalized points
-                normalized_points = []
-                for key in ['WRIST', 'THUMB_TIP', 'INDEX_TIP', 'MIDDLE_TIP']:
-                    point = points[key]
-                    x_norm = (point.x - wrist.x) / normalized_distance
-                    y_norm = (point.y - wrist.y) / normalized_distance
-                    normalized_points.extend([x_norm, y_norm])
+                # Get normalized points using the WRIST and MIDDLE_MCP
+                landmarks = features.landmarks_to_array(hand_landmarks)
+                normalized_points = feature_set.compute(landmarks).tolist()
 
                 # Draw original points to a better visualization
                 height, width, _ = frame.shape
                 colors = [(255, 0, 255), (255, 0, 0), (0, 255, 0), (0, 0, 255)]
-                for index, key in enumerate(['WRIST', 'THUMB_TIP', 'INDEX_TIP', 'MIDDLE_TIP']):
-                    px, py = int(points[key].x * width), int(points[key].y * height)
-                    cv2.circle(frame, (px, py), 6, colors[index], -1)
+                for index, key in enumerate(feature_set.points):
+                    point = landmarks[features.LANDMARK_INDEX[key]]
+                    px, py = int(point[0] * width), int(point[1] * height)
+                    cv2.circle(frame, (px, py), 6, colors[index % len(colors)], -1)
 
         # Get pressed key
         key = cv2.waitKey(1)
 
         # SPACE
         if key == 32:
-                
             # Save data when pressing the SPACE button
-            new_row = normalized_points + [current_label]
-            data.loc[len(data)] = new_row
+            if normalized_points is not None:
+                writer.append(normalized_points, current_label)
+
+        # R (hold to record)
+        elif key in (ord('r'), ord('R')):
+            burst_until = time.monotonic() + BURST_HOLD_SECONDS
 
         # ESC
         elif key == 27:
-            # Get the current working directory (which is usually your project's root)
-            project_root = os.getcwd()
-
-            # Define the path to the 'datasets' folder within your project
-            dataset_folder = os.path.join(project_root, "datasets")
-
-            # Create the 'datasets' folder if it doesn't exist
-            if not os.path.exists(dataset_folder):
-                os.makedirs(dataset_folder)
-
-            # Define the file path inside the 'datasets' folder
-            file_path = os.path.join(dataset_folder, current_label + ".csv")
-
-            # Save Dataset
-            data.to_csv(file_path, index=False)
-            print(f"Dataset saved: {file_path}")
+            break
 
-            # Clear camera and destroy the window
-            cap.release()
-            cv2.destroyAllWindows()
-            exit()
+        # Save every detected frame while the burst is active
+        is_recording = time.monotonic() < burst_until
+        if is_recording and normalized_points is not None and key != 32:
+            writer.append(normalized_points, current_label)
 
         # Show current label on screen and define title
         cv2.putText(frame, f"Label: {current_label}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 255), 2)
+        cv2.putText(frame, f"Samples: {writer.rows}", (10, 65), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 255), 2)
+        if is_recording:
+            cv2.circle(frame, (frame.shape[1] - 30, 30), 12, (0, 0, 255), -1)
         cv2.imshow("Get Gestures - Press ESC to exit", frame)
+
+    # Save the last samples
+    writer.close()
+    print(f"Dataset saved: {file_path} ({writer.rows} samples)")
+
+    # Create the augmented samples of this label
+    if AUGMENT_COPIES > 0:
+        augmented_path = os.path.join(dataset_folder, "augmented", current_label + ".csv")
+        count = augmentation.augment_file(file_path, augmented_path, AUGMENT_COPIES, feature_set)
+        print(f"{count} augmented samples saved on: {augmented_path}")
+
+    # Clear camera and destroy the window
+    cap.release()
+    cv2.destroyAllWindows()
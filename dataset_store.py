@@ -0,0 +1,255 @@
+# Import libraries
+import csv
+import hashlib
+import json
+import numpy as np
+import os
+import shutil
+import uuid
+
+# Files of a store folder
+FEATURES_FILE = "features.f32"
+LABELS_FILE = "labels.u16"
+META_FILE = "meta.json"
+DIGESTS_FILE = "digests.bin"
+
+# Every row has a 16-byte key, saved in DIGESTS_FILE so appends do not hash the old rows again
+DIGEST_SIZE = 16
+
+# Function to get the key used to find repeated rows
+def _row_digest(sample, code):
+    return hashlib.blake2b(sample.tobytes() + code.tobytes(), digest_size=DIGEST_SIZE).digest()
+
+# Function to get the keys of a chunk and which rows are new, the new keys are added to "seen"
+def _deduplicate(samples, codes, seen, deduplicate=True):
+    keep = np.ones(len(samples), dtype=bool)
+    digests = []
+    for index in range(len(samples)):
+        digest = _row_digest(samples[index], codes[index])
+        if deduplicate and digest in seen:
+            keep[index] = False
+        else:
+            seen.add(digest)
+            digests.append(digest)
+    return keep, b"".join(digests)
+
+# Function to write the metadata atomically, readers never see rows that are not fully written
+def _write_meta(store_path, meta):
+    meta_path = os.path.join(store_path, META_FILE)
+    with open(meta_path + ".tmp", "w") as handle:
+        json.dump(meta, handle, indent=2)
+    os.replace(meta_path + ".tmp", meta_path)
+
+# Function to read the metadata of a store: rows, columns, labels and the id of the store
+def read_meta(store_path):
+    with open(os.path.join(store_path, META_FILE)) as handle:
+        return json.load(handle)
+
+# Class that streams rows into a binary columnar store: a float32 feature block and a label-code array
+class StoreWriter:
+    def __init__(self, store_path, columns, deduplicate=True):
+        self.store_path = store_path
+        self.columns = list(columns)
+        self.deduplicate = deduplicate
+
+        # Write into a temporary folder, it replaces the old store only when everything is written
+        self._tmp_path = store_path + ".tmp"
+        if os.path.exists(self._tmp_path):
+            shutil.rmtree(self._tmp_path)
+        os.makedirs(self._tmp_path)
+        self._features = open(os.path.join(self._tmp_path, FEATURES_FILE), "wb")
+        self._labels = open(os.path.join(self._tmp_path, LABELS_FILE), "wb")
+        self._digests = open(os.path.join(self._tmp_path, DIGESTS_FILE), "w+b")
+
+        self.label_names = []
+        self._label_codes = {}
+        self._seen = set()
+        self.rows = 0
+        self.duplicates = 0
+
+    # Add a chunk of samples with shape (n_rows, n_features) and their labels
+    def write(self, samples, labels):
+        samples = np.ascontiguousarray(samples, dtype=np.float32).reshape(-1, len(self.columns))
+        codes = np.fromiter((self._code(label) for label in labels), dtype=np.uint16, count=len(samples))
+
+        # Skip rows with the same features and label as a row already stored
+        keep, digests = _deduplicate(samples, codes, self._seen, self.deduplicate)
+        self.duplicates += int((~keep).sum())
+        samples, codes = samples[keep], codes[keep]
+
+        self._features.write(samples.tobytes())
+        self._labels.write(codes.tobytes())
+        self._digests.write(digests)
+        self.rows += len(samples)
+
+    def _code(self, label):
+        if label not in self._label_codes:
+            self._label_codes[label] = len(self.label_names)
+            self.label_names.append(label)
+        return self._label_codes[label]
+
+    # Remember the end of the store, rollback() drops everything written after it
+    def checkpoint(self):
+        return (self.rows, self.duplicates, len(self.label_names),
+                self._features.tell(), self._labels.tell(), self._digests.tell())
+
+    # Drop the rows written after a checkpoint, e.g. a label file that failed to parse halfway
+    def rollback(self, checkpoint):
+        rows, duplicates, labels, features_end, labels_end, digests_end = checkpoint
+
+        # Forget the keys of the dropped rows, so the same rows can come back from another file
+        self._digests.seek(digests_end)
+        data = self._digests.read()
+        self._seen.difference_update(data[offset:offset + DIGEST_SIZE] for offset in range(0, len(data), DIGEST_SIZE))
+
+        for handle, end in ((self._features, features_end), (self._labels, labels_end), (self._digests, digests_end)):
+            handle.seek(end)
+            handle.truncate()
+        for label in self.label_names[labels:]:
+            del self._label_codes[label]
+        del self.label_names[labels:]
+        self.rows = rows
+        self.duplicates = duplicates
+
+    # Write the metadata and replace the old store
+    def close(self):
+        self._features.close()
+        self._labels.close()
+        self._digests.close()
+
+        # A new id tells trained models that the rows were rebuilt
+        meta = {"rows": self.rows, "columns": self.columns, "labels": self.label_names, "id": uuid.uuid4().hex}
+        _write_meta(self._tmp_path, meta)
+
+        if os.path.exists(self.store_path):
+            shutil.rmtree(self.store_path)
+        os.replace(self._tmp_path, self.store_path)
+
+# Class that adds rows at the end of an existing store without rewriting it
+# Only the keys of the old rows are read, so the cost depends on the new rows
+class StoreAppender:
+    def __init__(self, store_path, deduplicate=True):
+        self.store_path = store_path
+        self.deduplicate = deduplicate
+        self.meta = read_meta(store_path)
+        self.columns = self.meta["columns"]
+        self.first_row = self.meta["rows"]
+        self.rows = self.meta["rows"]
+        self.duplicates = 0
+        self._label_codes = {label: code for code, label in enumerate(self.meta["labels"])}
+
+        # Bytes after the rows of the metadata come from an append that did not finish, they are overwritten
+        self._files = []
+        for file_name, row_bytes in ((FEATURES_FILE, 4 * len(self.columns)), (LABELS_FILE, 2)):
+            handle = open(os.path.join(store_path, file_name), "r+b")
+            handle.truncate(self.rows * row_bytes)
+            handle.seek(0, os.SEEK_END)
+            self._files.append(handle)
+        self._features, self._labels = self._files
+
+        # Keys of the old rows, stores written before the keys were saved get them once here
+        digests_path = os.path.join(store_path, DIGESTS_FILE)
+        if not os.path.exists(digests_path) or os.path.getsize(digests_path) < self.rows * DIGEST_SIZE:
+            samples, codes, _, _ = load_store(store_path)
+            _, digests = _deduplicate(samples, codes, set(), deduplicate=False)
+            del samples, codes
+            with open(digests_path, "wb") as handle:
+                handle.write(digests)
+        self._digests = open(digests_path, "r+b")
+        self._digests.truncate(self.rows * DIGEST_SIZE)
+        data = self._digests.read()
+        self._seen = {data[offset:offset + DIGEST_SIZE] for offset in range(0, len(data), DIGEST_SIZE)}
+        self._digests.seek(0, os.SEEK_END)
+        self._files.append(self._digests)
+
+    # Add a chunk of samples with shape (n_rows, n_features) and their labels, returns the rows added
+    def write(self, samples, labels):
+        samples = np.ascontiguousarray(samples, dtype=np.float32).reshape(-1, len(self.columns))
+        codes = np.fromiter((self._code(label) for label in labels), dtype=np.uint16, count=len(samples))
+
+        # Skip rows that are already stored or repeated in the new ones
+        keep, digests = _deduplicate(samples, codes, self._seen, self.deduplicate)
+        self.duplicates += int((~keep).sum())
+        samples, codes = samples[keep], codes[keep]
+
+        self._features.write(samples.tobytes())
+        self._labels.write(codes.tobytes())
+        self._digests.write(digests)
+        self.rows += len(samples)
+        return len(samples)
+
+    # New labels get the next codes
+    def _code(self, label):
+        if label not in self._label_codes:
+            self._label_codes[label] = len(self.meta["labels"])
+            self.meta["labels"].append(label)
+        return self._label_codes[label]
+
+    # Save the rows to disk, then the metadata that makes them visible
+    def close(self):
+        for handle in self._files:
+            handle.flush()
+            os.fsync(handle.fileno())
+            handle.close()
+        self.meta["rows"] = self.rows
+        _write_meta(self.store_path, self.meta)
+
+# Function to load a store, the arrays are memory-mapped so nothing is read until it is used
+def load_store(store_path, mmap=True):
+    meta = read_meta(store_path)
+
+    shape = (meta["rows"], len(meta["columns"]))
+    features_path = os.path.join(store_path, FEATURES_FILE)
+    labels_path = os.path.join(store_path, LABELS_FILE)
+    if mmap and meta["rows"] > 0:
+        samples = np.memmap(features_path, dtype=np.float32, mode="r", shape=shape)
+        codes = np.memmap(labels_path, dtype=np.uint16, mode="r", shape=(meta["rows"],))
+    else:
+        samples = np.fromfile(features_path, dtype=np.float32).reshape(shape)
+        codes = np.fromfile(labels_path, dtype=np.uint16)
+    return samples, codes, meta["labels"], meta["columns"]
+
+# Function to load a dataset as (features, labels) from a store folder or a CSV file
+def load_dataset(path, columns):
+    if os.path.isdir(path):
+        samples, codes, label_names, store_columns = load_store(path)
+        if store_columns != list(columns):
+            raise ValueError(f"The store '{path}' has the columns {store_columns} but {list(columns)} were expected.")
+        return samples, np.asarray(label_names, dtype=object)[codes]
+
+    import pandas as pd
+    data = pd.read_csv(path)
+    return data[list(columns)].to_numpy(dtype=np.float32), data["label"].to_numpy()
+
+# Function to get the lines of a file that were fully written
+# A crash while recording can leave the last line cut, even with every field (e.g. "...,NUMBER_"), so it is ignored
+def _complete_lines(handle):
+    for line in handle:
+        if line.endswith("\n"):
+            yield line
+
+# Function to read a label CSV file in chunks without loading it fully
+def read_csv_chunks(path, columns, chunk_rows=65536):
+    with open(path, newline="") as handle:
+        reader = csv.reader(_complete_lines(handle))
+        header = next(reader, None)
+        if header is None:
+            return
+
+        # Columns can be in any order inside the file
+        indexes = [header.index(column) for column in columns]
+        label_index = header.index("label")
+
+        samples, labels = [], []
+        for row in reader:
+            if not row:
+                continue
+            if len(row) != len(header):
+                raise ValueError(f"line {reader.line_num} has {len(row)} fields but the header has {len(header)}")
+            samples.append([float(row[index]) for index in indexes])
+            labels.append(row[label_index])
+            if len(samples) >= chunk_rows:
+                yield np.array(samples, dtype=np.float32), labels
+                samples, labels = [], []
+        if samples:
+            yield np.array(samples, dtype=np.float32), labels
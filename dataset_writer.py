@@ -0,0 +1,95 @@
+# Import libraries
+import csv
+import os
+import time
+
+# Class that appends samples to a CSV file in small batches so a crash only loses the last batch
+class SampleWriter:
+    def __init__(self, path, columns, batch_size=64, fsync_interval=5.0):
+        self.path = path
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+
+        # Resume into the existing file, or create it with the header
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.existing_rows = self._prepare_file()
+
+        self._handle = open(path, "a", newline="")
+        self._writer = csv.writer(self._handle)
+        if self.existing_rows is None:
+            self._writer.writerow(self.columns)
+            self.existing_rows = 0
+            self._handle.flush()
+
+        self._buffer = []
+        self._last_sync = time.monotonic()
+        self.written_rows = 0
+
+    # Check the header of an existing file, remove a line cut by a crash and count the rows
+    def _prepare_file(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return None
+
+        with open(self.path, "rb+") as handle:
+            header = handle.readline().decode().strip().split(",")
+            if header != self.columns:
+                raise ValueError(f"The file '{self.path}' has the columns {header} but {self.columns} were expected.")
+
+            rows = 0
+            end_of_last_line = handle.tell()
+            for line in handle:
+                if not line.endswith(b"\n"):
+                    break
+                rows += 1
+                end_of_last_line += len(line)
+            handle.truncate(end_of_last_line)
+        return rows
+
+    # Number of rows in the file, counting the ones still in the buffer
+    @property
+    def rows(self):
+        return self.existing_rows + self.written_rows + len(self._buffer)
+
+    # Add one sample
+    def append(self, values, label):
+        self._buffer.append(list(values) + [label])
+        self._flush_if_due()
+
+    # Add many samples
+    def extend(self, samples, labels):
+        for values, label in zip(samples, labels):
+            self._buffer.append(list(values) + [label])
+        self._flush_if_due()
+
+    # Write a full batch, or a smaller one when the fsync interval expired so slow recording is saved too
+    def _flush_if_due(self):
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.flush()
+
+    # Write the buffer to the file, and to the disk when the fsync interval expired
+    def flush(self, sync=False):
+        if self._buffer:
+            self._writer.writerows(self._buffer)
+            self.written_rows += len(self._buffer)
+            self._buffer.clear()
+        self._handle.flush()
+
+        now = time.monotonic()
+        if sync or now - self._last_sync >= self.fsync_interval:
+            os.fsync(self._handle.fileno())
+            self._last_sync = now
+
+    def close(self):
+        if self._handle.closed:
+            return
+        self.flush(sync=True)
+        self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -1,193 +1,299 @@
-# Import libraries
+# Import libraries, mediapipe and the model libraries are imported later by the warm-up thread
+import time
+PROGRAM_START = time.perf_counter()
+
+import argparse
 import camera
+import capture
+import color_protocol
 import cv2
-import joblib
-import math
-import os
-import time
-import requests
-import mediapipe as mp
-import pandas as pd
+import devices
+import fanout_sender
+import features
+import hand_tracker
+import metrics
+import model_watcher
+import prediction_cache
+import preprocess
+import sender
+import session_log
+import signal
+import threading
+import warmup
+import numpy as np
+from gesture_control import GestureController, SendThrottle
 
 # Configuration to connect with ESP32
 ESP32_IP = "192.168.4.1"
 ENDPOINT_URL = f"http://{ESP32_IP}/setColor"
 
-# Variables to verify the connectoin with ESP32
-connection_tries = 0
-is_connected = True
+# Background sender that keeps the connection with ESP32 open
+color_sender = sender.ColorSender(ENDPOINT_URL)
 
-# Function to send color
+# Function to send color, it never blocks the vision loop
 def send_color(hex_color):
     # Simple validation
     if not hex_color.startswith('#') or len(hex_color) != 7:
         print("Error: The color must be in a valid format (ej: #RRGGBB).")
         return
 
-    try:
-        # Send request as a POST with a timeout
-        response = requests.post(ENDPOINT_URL, data=hex_color, timeout=0.5)
-        response.raise_for_status()
-    except requests.exceptions.Timeout:
-        # Get global variables
-        global connection_tries
-        global is_connected
-
-        # Verify connection tries
-        print(f"Timeout error '{hex_color}'. Verify the connection with ESP32.")
-        connection_tries += 1
-        if connection_tries == 2:
-            is_connected = False
-    except requests.exceptions.ConnectionError:
-        print(f"Connection error ESP32. Verify access point.")
-    except requests.exceptions.RequestException as e:
-        print(f"Error while changing the color '{hex_color}': {e}")
-
-# Function to normalize the distance between to points
-def distance(p1, p2):
-    return math.sqrt((p1.x - p2.x)**2 + (p1.y - p2.y)**2)
+    color_sender.send(hex_color)
 
 # Main code
 if __name__ == "__main__":
-    # Load trained model
-    model_path = "gesture_model.joblib"
-    if not os.path.exists(model_path):
-        # Verify the trained model exists
-        print(f"Error: The model file '{model_path}' was not found.")
-        print(f"Please execute 'train_mmodel.py' first to train and save the model.")
+    parser = argparse.ArgumentParser(description="Control an RGB LED with hand gestures.")
+    parser.add_argument("--metrics-overlay", action="store_true", help="Show FPS and stage latency on the frame")
+    parser.add_argument("--metrics-file", help="Export the metrics to this file periodically")
+    parser.add_argument("--metrics-format", default="json", choices=["json", "prometheus"])
+    parser.add_argument("--metrics-interval", type=float, default=10.0, help="Seconds between exports")
+    parser.add_argument("--record", metavar="FILE", help="Record landmarks and predictions to replay them later")
+    parser.add_argument("--headless", action="store_true", help="Run without drawing or windows, stop with SIGINT/SIGTERM")
+    parser.add_argument("--camera", type=int, help="Camera index, skips the camera selection menu")
+    parser.add_argument("--adaptive", action="store_true", help="Track the hand in a downscaled region of interest")
+    parser.add_argument("--target-fps", type=float, default=30.0, help="FPS kept by the adaptive mode")
+    parser.add_argument("--cache-predictions", action="store_true", help="Reuse predictions while the hand does not move")
+    parser.add_argument("--devices", metavar="FILE", help="Send the color to every board of this registry (JSON)")
+    parser.add_argument("--udp", action="store_true", help="Send binary UDP datagrams to the ESP32 instead of HTTP")
+    parser.add_argument("--no-reload", action="store_true", help="Do not reload the model when its file changes")
+    args = parser.parse_args()
+
+    # Several boards from the device registry instead of the single ESP32
+    if args.devices:
+        registry = devices.load_devices(args.devices)
+        color_sender = fanout_sender.FanoutSender(registry)
+        print(f"Sending colors to {len(registry)} devices from '{args.devices}'.")
+    elif args.udp:
+        color_sender = color_protocol.UdpColorSender(ESP32_IP, color_protocol.DEFAULT_PORT)
+
+    # Verify the trained model exists
+    model_path = warmup.find_model_path()
+    if model_path is None:
+        print(f"Error: The model file '{warmup.MODEL_PATHS[-1]}' was not found.")
+        print(f"Please execute 'train_model.py' first to train and save the model.")
         exit()
-    model = joblib.load(model_path)
-
-    # Define columns
-    model_columns = [
-        "WRIST_X", "WRIST_Y",
-        "THUMB_TIP_X", "THUMB_TIP_Y",
-        "INDEX_TIP_X", "INDEX_TIP_Y",
-        "MIDDLE_TIP_X", "MIDDLE_TIP_Y"
-    ]
-
-    # MediaPipe setup
-    mp_hands = mp.solutions.hands
-    mp_drawing = mp.solutions.drawing_utils
-    hands = mp_hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5)
-
-    # Get camera
-    cameras = camera.get_camera_info()
-    camera_index = camera.show_camera_selection(cameras)
-    cap = cv2.VideoCapture(camera_index, cv2.CAP_ANY)
-
-    # Variables and control
-    red, green, blue = 0, 0, 0
-    selected_channel = None
-    last_prediction = None
-    prediction_start_time = None
+
+    # Load the model and MediaPipe in the background while the camera is selected
+    model_warmup = warmup.ModelWarmup(model_path).start()
+
+    # Get camera, from the command line or the selection menu
+    if args.camera is not None:
+        camera_index = args.camera
+    elif args.headless:
+        cameras = camera.get_camera_info()
+        camera_index = cameras[0][0] if cameras else None
+    else:
+        cameras = camera.get_camera_info()
+        camera_index = camera.show_camera_selection(cameras)
+    if camera_index is None:
+        print("No camera selected!")
+        exit()
+    cap = capture.FrameGrabber(camera_index, cv2.CAP_ANY).start()
+
+    # Wait for the warm-up
+    classifier, hands = model_warmup.result()
+    print("Warm-up: " + ", ".join(f"{name} {seconds:.2f} s" for name, seconds in model_warmup.timings.items()))
+    first_prediction_reported = False
+
+    # Reuse the last prediction while a gesture is held still
+    cache = None
+    if args.cache_predictions:
+        cache = prediction_cache.PredictionCache(classifier)
+        classifier = cache
+
+    # Load new versions of the model file (e.g. from "train_model.py --update") in the background
+    watcher = None
+    if not args.no_reload:
+        watcher = model_watcher.ModelWatcher(model_path).start()
+
+    # Reusable landmark array and feature vector
+    landmarks = np.empty((features.NUM_LANDMARKS, 3), dtype=np.float64)
+    feature_vector = np.empty(classifier.n_features, dtype=np.float64)
+    drawn_points = [features.LANDMARK_INDEX[name] for name in features.DEFAULT_FEATURES.points]
+
+    # Gesture logic, hold a gesture for DELAY_SECONDS to activate it
+    # The gesture is the majority of the last VOTE_SECONDS, so one wrong frame does not reset the hold
+    # Once active, the thumbs change the channel RAMP_RATE units per second at any FPS
     DELAY_SECONDS = 2
+    VOTE_SECONDS = 0.3
+    RAMP_RATE = 30.0
+    controller = GestureController(DELAY_SECONDS, vote_seconds=VOTE_SECONDS, ramp_rate=RAMP_RATE)
 
     # Variables for the ESP32
-    last_sent_hex_color = ""
-    last_sent_time = time.time()
     SEND_INTERVAL_SECONDS = 0.1
+    throttle = SendThrottle(SEND_INTERVAL_SECONDS)
+
+    # Session recorder for replay.py
+    recorder = None
+    if args.record:
+        recorder = session_log.SessionRecorder(args.record, classifier.classes)
+
+    # Adaptive resolution and region of interest around the last hand
+    tracker = None
+    if args.adaptive:
+        tracker = hand_tracker.AdaptiveHandTracker(hands, target_fps=args.target_fps)
+
+    # Frame preprocessing, headless mode does not need the mirrored image so it mirrors the landmarks instead
+    preprocessor = preprocess.FramePreprocessor(flip_image=not args.headless)
+
+    # Latency of every stage of the loop, the overlay can be toggled with the "M" key
+    stage_timer = metrics.StageTimer()
+    show_metrics = args.metrics_overlay
+    exporter = None
+    if args.metrics_file:
+        exporter = metrics.MetricsExporter(args.metrics_file, args.metrics_format, args.metrics_interval)
+
+    # Stop the loop cleanly with Ctrl+C or a service manager (SIGTERM)
+    # Installed only now, so Ctrl+C during the camera menu or the warm-up still exits right away
+    stop_event = threading.Event()
+    def request_stop(signum, _):
+        print(f"Received signal {signum}, stopping...")
+        stop_event.set()
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
 
-    while True:
+    while not stop_event.is_set():
+        stage_timer.begin_frame()
+
+        # Swap in a reloaded model, a model with other gestures needs a restart
+        new_classifier = watcher.poll() if watcher is not None else None
+        if new_classifier is not None:
+            if list(new_classifier.classes) != list(classifier.classes):
+                print(f"⚠️ Warning: The new model has the gestures {list(new_classifier.classes)}, restart to use it.")
+            elif cache is not None:
+                cache.classifier = new_classifier
+                cache.clear()
+                print("Model reloaded.")
+            else:
+                classifier = new_classifier
+                print("Model reloaded.")
         ret, frame = cap.read()
         if not ret:
-            break
+            # No new frame in time, check the stop signal and keep waiting unless the camera is gone
+            if cap.ended:
+                break
+            continue
+        stage_timer.lap("read")
+
+        frame, frame_rgb = preprocessor.process(frame)
+        stage_timer.lap("preprocess")
 
-        frame = cv2.flip(frame, 1)
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = hands.process(frame_rgb)
+        # Landmarks of the detected hand as a (21, 3) array
+        if tracker is not None:
+            hand = tracker.process(frame_rgb)
+        else:
+            results = hands.process(frame_rgb)
+            hand = None
+            if results.multi_hand_landmarks:
+                hand = features.landmarks_to_array(results.multi_hand_landmarks[0], out=landmarks)
+        stage_timer.lap("hands")
 
         # It is detecting the hands
-        if results.multi_hand_landmarks:
-            for hand_landmarks in results.multi_hand_landmarks:
-                # Get key points
-                puntos = {
-                    'WRIST': hand_landmarks.landmark[0],
-                    'THUMB_TIP': hand_landmarks.landmark[4],
-                    'INDEX_TIP': hand_landmarks.landmark[8],
-                    'MIDDLE_TIP': hand_landmarks.landmark[12],
-                    'MIDDLE_MCP': hand_landmarks.landmark[9]
-                }
-
-                wrist = puntos['WRIST']
-                middle_mcp = puntos['MIDDLE_MCP']
-                d = distance(wrist, middle_mcp)
-                if d == 0:
-                    d = 1e-6
-
-                normalized = []
-                for key in ['WRIST', 'THUMB_TIP', 'INDEX_TIP', 'MIDDLE_TIP']:
-                    p = puntos[key]
-                    x = (p.x - wrist.x) / d
-                    y = (p.y - wrist.y) / d
-                    normalized.extend([x, y])
-
-                # Predict gesture
-                input_data = pd.DataFrame([normalized], columns = model_columns)
-                prediction = model.predict(input_data)[0]
-
-                # Gesture detection
-                current_time = time.time()
-                if prediction == last_prediction:
-                    if prediction_start_time is None:
-                        prediction_start_time = current_time
-                    elif current_time - prediction_start_time >= DELAY_SECONDS:
-                        if prediction == "NUMBER_1":
-                            selected_channel = "red"
-                        elif prediction == "NUMBER_2":
-                            selected_channel = "green"
-                        elif prediction == "NUMBER_3":
-                            selected_channel = "blue"
-                        elif prediction == "THUMB_UP" and selected_channel:
-                            if selected_channel == "red":
-                                red = min(255, red + 1)
-                            elif selected_channel == "green":
-                                green = min(255, green + 1)
-                            elif selected_channel == "blue":
-                                blue = min(255, blue + 1)
-                        elif prediction == "THUMB_DOWN" and selected_channel:
-                            if selected_channel == "red":
-                                red = max(0, red - 1)
-                            elif selected_channel == "green":
-                                green = max(0, green - 1)
-                            elif selected_channel == "blue":
-                                blue = max(0, blue - 1)
-                else:
-                    last_prediction = prediction
-                    prediction_start_time = current_time
-
-                # Draw points
+        current_time = time.time()
+        prediction = None
+        if hand is not None:
+            # Get normalized features
+            preprocessor.fix_landmarks(hand)
+            features.DEFAULT_FEATURES.compute(hand, out=feature_vector)
+
+            # Predict gesture
+            prediction, probabilities = classifier.predict(feature_vector)
+            if not first_prediction_reported:
+                print(f"Time to first prediction: {time.perf_counter() - PROGRAM_START:.2f} s")
+                first_prediction_reported = True
+
+            # Gesture detection
+            controller.update(prediction, current_time, probabilities.max())
+
+            # Draw points
+            if not args.headless:
                 h, w, _ = frame.shape
-                for key in ['WRIST', 'THUMB_TIP', 'INDEX_TIP', 'MIDDLE_TIP']:
-                    px, py = int(puntos[key].x * w), int(puntos[key].y * h)
+                for index in drawn_points:
+                    px, py = int(hand[index, 0] * w), int(hand[index, 1] * h)
                     cv2.circle(frame, (px, py), 6, (255, 0, 255), -1)
+        stage_timer.lap("predict")
 
-        # Show square of the current RGB color
-        cv2.rectangle(frame, (10, 10), (80, 80), (blue, green, red), -1)
-
-        # Show selected channel and RGB using hexadecimal value
-        canal = selected_channel if selected_channel else "NINGUNO"
-        hex_color = f"#{red:02X}{green:02X}{blue:02X}"
-        cv2.putText(frame, f"Canal: {canal}", (100, 40),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv2.putText(frame, f"Color: {hex_color}", (100, 70),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+        # Save the frame for replay
+        if recorder is not None:
+            recorder.record(current_time, hand, prediction)
 
         # Send hexadecimal value to ESP32
-        if is_connected:
-            current_time_for_send = time.time()
-            if hex_color != last_sent_hex_color and (current_time_for_send - last_sent_time) >= SEND_INTERVAL_SECONDS:
-                send_color(hex_color)
-                last_sent_hex_color = hex_color
-                last_sent_time = current_time_for_send
-
-        # Show window
-        cv2.imshow("Gesture Detector - Press ESC to exit", frame)
-        if cv2.waitKey(1) & 0xFF == 27:
-            # Turn off LED
-            if is_connected:
-                send_color("#000000")
-            break
+        hex_color = controller.hex_color
+        if throttle.should_send(hex_color, time.time()):
+            send_color(hex_color)
+        stage_timer.lap("send")
+
+        # Headless mode does not draw or show anything
+        if args.headless:
+            stage_timer.end_frame()
+        else:
+            # Show square of the current RGB color
+            red, green, blue = controller.rgb
+            cv2.rectangle(frame, (10, 10), (80, 80), (blue, green, red), -1)
+
+            # Show selected channel and RGB using hexadecimal value
+            canal = controller.selected_channel if controller.selected_channel else "NINGUNO"
+            cv2.putText(frame, f"Canal: {canal}", (100, 40),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            cv2.putText(frame, f"Color: {hex_color}", (100, 70),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+
+            # Show window
+            if show_metrics:
+                metrics.draw_overlay(frame, stage_timer)
+            cv2.imshow("Gesture Detector - Press ESC to exit", frame)
+            key = cv2.waitKey(1) & 0xFF
+            stage_timer.lap("render")
+            stage_timer.end_frame()
+
+            if key == 27:
+                break
+            elif key in (ord('m'), ord('M')):
+                show_metrics = not show_metrics
+
+        # Export metrics
+        if exporter is not None:
+            extra = {"capture": cap.stats(), "sender": color_sender.stats()}
+            if tracker is not None:
+                extra["tracker"] = tracker.stats()
+            if cache is not None:
+                extra["prediction_cache"] = cache.stats()
+            exporter.maybe_export(stage_timer, extra)
+
+    # Turn off LED
+    send_color("#000000")
+
+    # Show stage latency and capture counters
+    for stage, values in stage_timer.summary().items():
+        print(f"{stage}: p50 {values['p50']:.2f} ms, p90 {values['p90']:.2f} ms, p99 {values['p99']:.2f} ms")
+    stats = cap.stats()
+    print(f"Frames read: {stats['frames_read']}, dropped: {stats['frames_dropped']}, "
+          f"queue age avg/max: {stats['avg_queue_age_ms']:.1f}/{stats['max_queue_age_ms']:.1f} ms")
+
+    if tracker is not None:
+        stats = tracker.stats()
+        print(f"Adaptive tracking: scale {stats['scale']:.2f}, ROI frames: {stats['roi_frames']}, "
+              f"full frames: {stats['full_frames']}, tracking lost: {stats['tracking_lost']}")
+        tracker.close()
+
+    if cache is not None:
+        stats = cache.stats()
+        print(f"Prediction cache: hit rate {stats['hit_rate'] * 100:.1f}% (motion {stats['motion_hits']}, "
+              f"cache {stats['cache_hits']}, misses {stats['misses']}, evictions {stats['evictions']})")
+
+    stats = color_sender.stats()
+    print(f"Colors sent: {stats['sent']}, failed: {stats['failed']}, coalesced: {stats['coalesced']}, "
+          f"latency avg/max: {stats['avg_latency_ms']:.1f}/{stats['max_latency_ms']:.1f} ms")
+    for name, device in stats.get("per_device", {}).items():
+        if not device["connected"]:
+            print(f"⚠️ Device '{name}' is not responding: {device['last_error']}")
+
+    if recorder is not None:
+        recorder.close()
+        print(f"Session recorded on: {args.record} ({recorder.records} frames)")
 
+    color_sender.close()
+    if watcher is not None:
+        watcher.stop()
     cap.release()
-    cv2.destroyAllWindows()
+    if not args.headless:
+        cv2.destroyAllWindows()
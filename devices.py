@@ -0,0 +1,41 @@
+# Import libraries
+import json
+import os
+from urllib.parse import urlsplit
+
+# Default registry file, a list of {"name": ..., "url": "http://<ip>/setColor"}
+DEVICES_PATH = "devices.json"
+
+# Function to check one device entry
+def validate_device(device, index=0):
+    if not isinstance(device, dict) or "url" not in device:
+        raise ValueError(f"Device {index} must be an object with an 'url'.")
+
+    url = urlsplit(device["url"])
+    if url.scheme != "http" or not url.hostname:
+        raise ValueError(f"Device {index} has an invalid url '{device['url']}', only http:// is supported.")
+    return {"name": str(device.get("name") or url.netloc), "url": device["url"]}
+
+# Function to read the registry, returns a list of devices
+def load_devices(path=DEVICES_PATH):
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"The device registry '{path}' was not found.")
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        data = data.get("devices", [])
+
+    registry = [validate_device(device, index) for index, device in enumerate(data)]
+    names = [device["name"] for device in registry]
+    if len(set(names)) != len(names):
+        raise ValueError(f"The device registry '{path}' has repeated names.")
+    return registry
+
+# Function to save the registry atomically
+def save_devices(path, registry):
+    registry = [validate_device(device, index) for index, device in enumerate(registry)]
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"devices": registry}, f, indent=2)
+    os.replace(temp_path, path)
@@ -0,0 +1,272 @@
+# Import libraries
+import argparse
+import color_protocol
+import devices
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Handler that mimics "handleColorChange" of rgb_controller/src/main.cpp
+class ColorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    # Send the headers and the body in one packet like the ESP32 does
+    wbufsize = -1
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        board = self.server.board
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode(errors="replace")
+
+        # Slow boards answer late
+        if board.delay > 0:
+            time.sleep(board.delay)
+
+        if self.path != "/setColor":
+            status, reply = 404, b"Not Found"
+        elif body:
+            board.set_color(body)
+            status, reply = 200, b"Color updated successfully!"
+        else:
+            status, reply = 400, b"Bad Request: Please send a hex color in the request body (e.g., #FF00FF)."
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *_):
+        pass
+
+# Class with one simulated board, its HTTP server, its UDP listener and the color of its LED
+class SimulatedBoard:
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, name=None, udp_port=0, record_arrivals=False):
+        self.delay = delay
+        self.server = ThreadingHTTPServer((host, port), ColorHandler)
+        self.server.daemon_threads = True
+        self.server.board = self
+        self.host, self.port = self.server.server_address[:2]
+        self.name = name or f"sim-{self.port}"
+
+        # Binary datagrams, see color_protocol.py
+        self.udp_socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        self.udp_socket.bind((host, udp_port))
+        self.udp_socket.settimeout(0.2)
+        self.udp_port = self.udp_socket.getsockname()[1]
+        self.sequence_filter = color_protocol.SequenceFilter()
+
+        # LED state and counters
+        self._lock = threading.Lock()
+        self.rgb = (0, 0, 0)
+        self.updates = 0
+        self.http_updates = 0
+        self.udp_updates = 0
+        self.udp_dropped = 0
+        self.invalid = 0
+        self.first_update_time = None
+        self.last_update_time = None
+        self._threads = []
+        self._running = False
+
+        # Arrival time of every applied datagram, to measure the latency in the same process
+        self.arrivals = [] if record_arrivals else None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/setColor"
+
+    # Same validation and parsing as "changeColor" in main.cpp
+    def set_color(self, hex_color):
+        try:
+            rgb = color_protocol.hex_to_rgb(hex_color)
+        except ValueError:
+            with self._lock:
+                self.invalid += 1
+            return False
+        self._apply(rgb)
+        with self._lock:
+            self.http_updates += 1
+        return True
+
+    def _apply(self, rgb):
+        now = time.perf_counter()
+        with self._lock:
+            self.rgb = rgb
+            self.updates += 1
+            if self.first_update_time is None:
+                self.first_update_time = now
+            self.last_update_time = now
+        return now
+
+    # UDP loop, invalid, duplicated and out of order datagrams are dropped
+    def _udp_loop(self):
+        while self._running:
+            try:
+                packet, source = self.udp_socket.recvfrom(64)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            try:
+                sequence, rgb = color_protocol.decode_color(packet)
+            except ValueError:
+                with self._lock:
+                    self.invalid += 1
+                continue
+            if not self.sequence_filter.accept(sequence, source):
+                with self._lock:
+                    self.udp_dropped += 1
+                continue
+
+            now = self._apply(rgb)
+            with self._lock:
+                self.udp_updates += 1
+            if self.arrivals is not None:
+                self.arrivals.append((sequence, now))
+
+    # Start serving on background threads
+    def start(self):
+        self._running = True
+        self._threads = [
+            threading.Thread(target=self.server.serve_forever, name=self.name, daemon=True),
+            threading.Thread(target=self._udp_loop, name=f"{self.name}-udp", daemon=True)
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self.server.shutdown()
+        self.server.server_close()
+        for thread in self._threads[1:]:
+            thread.join(timeout=1.0)
+        self.udp_socket.close()
+
+    def stats(self):
+        with self._lock:
+            duration = (self.last_update_time - self.first_update_time) if self.updates > 1 else 0.0
+            return {
+                "color": "#{:02X}{:02X}{:02X}".format(*self.rgb),
+                "updates": self.updates,
+                "http_updates": self.http_updates,
+                "udp_updates": self.udp_updates,
+                "udp_dropped": self.udp_dropped,
+                "invalid": self.invalid,
+                "updates_per_second": (self.updates - 1) / duration if duration > 0 else 0.0
+            }
+
+# Function to start several boards on consecutive ports (or free ports when port is 0)
+def start_boards(count, host="127.0.0.1", port=0, delay=0.0, slow=0, slow_delay=1.0, udp_port=0):
+    boards = []
+    for index in range(count):
+        board_delay = slow_delay if index < slow else delay
+        board_port = port + index if port else 0
+        board_udp_port = udp_port + index if udp_port else 0
+        boards.append(SimulatedBoard(host, board_port, board_delay, udp_port=board_udp_port).start())
+    return boards
+
+# Function to measure the update rate and latency of HTTP and UDP against a local board
+def compare_protocols(updates=2000):
+    import requests
+    board = SimulatedBoard(record_arrivals=True).start()
+    colors = [f"#{index % 256:02X}{(index // 256) % 256:02X}80" for index in range(updates)]
+    results = {}
+
+    # HTTP: one keep-alive POST per color, the latency is the round trip
+    session = requests.Session()
+    latencies = []
+    start = time.perf_counter()
+    for color in colors:
+        request_start = time.perf_counter()
+        session.post(board.url, data=color, timeout=1.0)
+        latencies.append(time.perf_counter() - request_start)
+    elapsed = time.perf_counter() - start
+    session.close()
+    results["http"] = {
+        "delivered": board.stats()["http_updates"],
+        "updates_per_second": updates / elapsed,
+        "avg_latency_ms": sum(latencies) / len(latencies) * 1000,
+        "max_latency_ms": max(latencies) * 1000
+    }
+
+    # UDP: fire and forget, the latency goes from the send call to the board applying the color
+    udp_sender = color_protocol.UdpColorSender(board.host, board.udp_port, repeat_on_close=0)
+    send_times = {}
+    start = time.perf_counter()
+    for color in colors:
+        send_times[udp_sender.sequence + 1] = time.perf_counter()
+        udp_sender.send(color)
+    elapsed = time.perf_counter() - start
+    deadline = time.perf_counter() + 1.0
+    while board.stats()["udp_updates"] < updates and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    latencies = [arrival - send_times[sequence] for sequence, arrival in board.arrivals]
+    results["udp"] = {
+        "delivered": board.stats()["udp_updates"],
+        "updates_per_second": updates / elapsed,
+        "avg_latency_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "max_latency_ms": max(latencies, default=0.0) * 1000
+    }
+
+    # Datagrams out of order: the old ones must be dropped
+    dropped_before = board.stats()["udp_dropped"]
+    for sequence in (updates + 10, updates + 5, updates + 11, updates + 11):
+        udp_sender.socket.sendto(color_protocol.encode_color(sequence, (1, 2, 3)), (board.host, board.udp_port))
+    time.sleep(0.2)
+    results["udp"]["stale_dropped"] = board.stats()["udp_dropped"] - dropped_before
+
+    udp_sender.close()
+    board.stop()
+    return results
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate ESP32 RGB controllers on this computer.")
+    parser.add_argument("--count", type=int, default=1, help="Number of boards")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="Port of the first board, the rest use the next ones")
+    parser.add_argument("--udp-port", type=int, default=color_protocol.DEFAULT_PORT,
+                        help="UDP port of the first board, the rest use the next ones")
+    parser.add_argument("--delay", type=float, default=0.0, help="Seconds every board waits before answering")
+    parser.add_argument("--slow", type=int, default=0, help="Number of boards that answer after --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=1.0)
+    parser.add_argument("--write-devices", metavar="FILE", help="Save the boards as a device registry")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between reports")
+    parser.add_argument("--compare", type=int, metavar="UPDATES",
+                        help="Measure HTTP against UDP with this many updates and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        results = compare_protocols(args.compare)
+        print(f"{'Protocol':<10} {'Delivered':>10} {'Updates/s':>10} {'Avg ms':>8} {'Max ms':>8}")
+        for protocol, result in results.items():
+            print(f"{protocol:<10} {result['delivered']:>10} {result['updates_per_second']:>10.0f} "
+                  f"{result['avg_latency_ms']:>8.3f} {result['max_latency_ms']:>8.3f}")
+        print(f"Stale datagrams dropped: {results['udp']['stale_dropped']}/2")
+        exit()
+
+    boards = start_boards(args.count, args.host, args.port, args.delay, args.slow, args.slow_delay, args.udp_port)
+    for board in boards:
+        print(f"{board.name} listening on {board.url} and udp://{board.host}:{board.udp_port}"
+              + (f" (delay {board.delay} s)" if board.delay else ""))
+
+    if args.write_devices:
+        devices.save_devices(args.write_devices, [{"name": board.name, "url": board.url} for board in boards])
+        print(f"Device registry saved to '{args.write_devices}'.")
+
+    try:
+        while True:
+            time.sleep(args.interval)
+            for board in boards:
+                stats = board.stats()
+                print(f"{board.name}: {stats['color']}, {stats['updates']} updates "
+                      f"({stats['updates_per_second']:.1f}/s, HTTP {stats['http_updates']}, UDP {stats['udp_updates']}), "
+                      f"{stats['udp_dropped']} stale datagrams, {stats['invalid']} invalid")
+    except KeyboardInterrupt:
+        pass
+    for board in boards:
+        board.stop()
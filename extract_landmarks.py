@@ -0,0 +1,200 @@
+# Import libraries
+import argparse
+import cv2
+import features
+import multiprocessing
+import os
+import preprocess
+import time
+import numpy as np
+from dataset_writer import SampleWriter
+
+# Supported file types
+VIDEO_EXTENSIONS = {".mp4", ".avi", ".mov", ".mkv", ".webm"}
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+
+# MediaPipe instance for the images of the current worker process, created once per worker
+_worker_hands = {}
+_worker_options = {}
+
+# Function to find the files to process, the label is the name of the parent folder
+def find_media(input_dir, label=None):
+    videos, images = [], []
+    for root, _, files in os.walk(input_dir):
+        for filename in sorted(files):
+            extension = os.path.splitext(filename)[1].lower()
+            file_label = label or os.path.basename(root)
+            path = os.path.join(root, filename)
+            if extension in VIDEO_EXTENSIONS:
+                videos.append((path, file_label))
+            elif extension in IMAGE_EXTENSIONS:
+                images.append((path, file_label))
+    return videos, images
+
+# Function to split the work in small tasks so long videos also use every core
+def build_tasks(videos, images, segment_frames, image_batch):
+    tasks = []
+    for path, label in videos:
+        cap = cv2.VideoCapture(path)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+
+        # Unknown length, process the whole video in one task
+        if frame_count <= 0:
+            tasks.append(("video", label, path, 0, None))
+            continue
+
+        for start in range(0, frame_count, segment_frames):
+            tasks.append(("video", label, path, start, min(start + segment_frames, frame_count)))
+
+    for start in range(0, len(images), image_batch):
+        batch = images[start:start + image_batch]
+        tasks.append(("images", None, batch, 0, None))
+    return tasks
+
+# Save the options of a worker, MediaPipe is created on its first task
+def _init_worker(flip, min_detection_confidence):
+    _worker_options["min_detection_confidence"] = min_detection_confidence
+
+    # Nobody sees the frames, so the landmarks are mirrored instead of the image
+    _worker_options["preprocessor"] = preprocess.FramePreprocessor(flip_image=False) if flip else None
+
+# Create a Hands instance with the options of the worker
+def _create_hands(static_image_mode):
+    import mediapipe as mp
+    return mp.solutions.hands.Hands(
+        static_image_mode=static_image_mode,
+        max_num_hands=1,
+        min_detection_confidence=_worker_options["min_detection_confidence"]
+    )
+
+# Get the Hands instance of the worker for images, static images do not keep state between calls
+def _get_image_hands():
+    if "images" not in _worker_hands:
+        _worker_hands["images"] = _create_hands(True)
+    return _worker_hands["images"]
+
+# Get the normalized features of one frame, or None if there is no hand
+def _frame_features(hands, frame):
+    preprocessor = _worker_options["preprocessor"]
+    if preprocessor is not None:
+        _, frame_rgb = preprocessor.process(frame)
+    else:
+        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    results = hands.process(frame_rgb)
+    if not results.multi_hand_landmarks:
+        return None
+    landmarks = features.landmarks_to_array(results.multi_hand_landmarks[0])
+    if preprocessor is not None:
+        preprocessor.fix_landmarks(landmarks)
+    return features.DEFAULT_FEATURES.compute(landmarks)
+
+# Process one task inside a worker, frames are discarded as soon as they are read
+def _process_task(task):
+    kind, label, source, start, end = task
+    rows, labels = [], []
+    frames = 0
+
+    if kind == "video":
+        # A new tracking graph for every task, the hand of another video or segment must not carry over
+        hands = _create_hands(False)
+        cap = cv2.VideoCapture(source)
+        if start:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+
+        position = start
+        while end is None or position < end:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            position += 1
+            frames += 1
+
+            vector = _frame_features(hands, frame)
+            if vector is not None:
+                rows.append(vector)
+                labels.append(label)
+        cap.release()
+        hands.close()
+    else:
+        hands = _get_image_hands()
+        for path, image_label in source:
+            frame = cv2.imread(path)
+            if frame is None:
+                continue
+            frames += 1
+
+            vector = _frame_features(hands, frame)
+            if vector is not None:
+                rows.append(vector)
+                labels.append(image_label)
+
+    n_features = features.DEFAULT_FEATURES.n_features
+    samples = np.array(rows, dtype=np.float64).reshape(-1, n_features)
+    return samples, labels, frames
+
+# Class that keeps one sample writer per label
+class LabelFiles:
+    def __init__(self, output_dir, columns):
+        self.output_dir = output_dir
+        self.columns = columns
+        self._writers = {}
+
+    def write(self, samples, labels):
+        for sample, label in zip(samples, labels):
+            if label not in self._writers:
+                path = os.path.join(self.output_dir, label + ".csv")
+                self._writers[label] = SampleWriter(path, self.columns, batch_size=1024)
+            self._writers[label].append(sample, label)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract hand landmarks from recorded videos and images.")
+    parser.add_argument("input_dir", help="Folder with one subfolder per label (e.g. videos/NUMBER_1/clip.mp4)")
+    parser.add_argument("--output-dir", default=os.path.join(os.getcwd(), "datasets"))
+    parser.add_argument("--label", help="Use this label for every file instead of the folder name")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--segment-frames", type=int, default=900, help="Frames of video per task")
+    parser.add_argument("--image-batch", type=int, default=64, help="Images per task")
+    parser.add_argument("--no-flip", action="store_true", help="Do not mirror frames like the live camera does")
+    parser.add_argument("--min-detection-confidence", type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Find files and split the work
+    videos, images = find_media(args.input_dir, args.label)
+    tasks = build_tasks(videos, images, args.segment_frames, args.image_batch)
+    if not tasks:
+        print(f"No videos or images were found in '{args.input_dir}'.")
+        exit()
+    print(f"Processing {len(videos)} videos and {len(images)} images in {len(tasks)} tasks "
+          f"with {args.workers} workers...")
+
+    # Results are written as soon as each task finishes
+    # Same features as merge_dataset.py, train_model.py and the live detection
+    output = LabelFiles(args.output_dir, features.FEATURE_COLUMNS + ["label"])
+    total_frames, total_samples = 0, 0
+    start_time = time.perf_counter()
+
+    with multiprocessing.Pool(
+        processes=args.workers,
+        initializer=_init_worker,
+        initargs=(not args.no_flip, args.min_detection_confidence)
+    ) as pool:
+        try:
+            for index, (samples, labels, frames) in enumerate(pool.imap_unordered(_process_task, tasks), 1):
+                output.write(samples, labels)
+                total_frames += frames
+                total_samples += len(labels)
+                print(f"[{index}/{len(tasks)}] {total_samples} samples from {total_frames} frames")
+        finally:
+            output.close()
+
+    elapsed = time.perf_counter() - start_time
+    print(f"Done: {total_samples} samples from {total_frames} frames in {elapsed:.1f} s "
+          f"({total_frames / max(elapsed, 1e-9):.1f} frames/s). Files saved on: {args.output_dir}")
@@ -0,0 +1,276 @@
+# Import libraries
+import argparse
+import asyncio
+import devices
+import sender
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Class with the connection and the delivery state of one device
+class DeviceChannel:
+    def __init__(self, name, url, min_backoff=0.5, max_backoff=5.0):
+        parts = urlsplit(url)
+        self.name = name
+        self.url = url
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.path = parts.path or "/"
+
+        # Pending color, backoff and counters (same policy as ColorSender), only used from the event loop
+        self.state = sender.DeliveryState(min_backoff, max_backoff, name)
+        self.wakeup = None
+
+        # Keep-alive connection reused by every request to this device
+        self.reader = None
+        self.writer = None
+        self.connections = 0
+
+    # Close the connection, the next request opens a new one
+    def disconnect(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = None
+        self.writer = None
+
+    def stats(self):
+        return {"url": self.url, "connections": self.connections, **self.state.stats()}
+
+# Class that sends every color to many ESP32 boards at once from an asyncio loop on a background thread
+# Every device has its own connection, pending slot and backoff, so a slow or dead board never holds up the others
+class FanoutSender:
+    def __init__(self, registry, timeout=0.5, min_backoff=0.5, max_backoff=5.0):
+        self.timeout = timeout
+        self.channels = [DeviceChannel(device["name"], device["url"], min_backoff, max_backoff)
+                         for device in registry]
+
+        self._loop = None
+        self._thread = None
+        self._stopped = None
+        self._running = False
+        self._ready = threading.Event()
+
+    # Start the event loop thread
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, name="FanoutSender", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+
+    async def _main(self):
+        self._stopped = asyncio.Event()
+        for channel in self.channels:
+            channel.wakeup = asyncio.Event()
+        tasks = [asyncio.ensure_future(self._device_loop(channel)) for channel in self.channels]
+        self._ready.set()
+
+        await self._stopped.wait()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for channel in self.channels:
+            channel.disconnect()
+
+    # Queue a color for every device without blocking, returns immediately
+    def send(self, hex_color):
+        if not self._running:
+            self.start()
+        self._loop.call_soon_threadsafe(self._publish, hex_color)
+
+    def _publish(self, hex_color):
+        for channel in self.channels:
+            channel.state.offer(hex_color)
+            channel.wakeup.set()
+
+    # Sender loop of one device
+    async def _device_loop(self, channel):
+        state = channel.state
+        while True:
+            await channel.wakeup.wait()
+            channel.wakeup.clear()
+
+            # Wait for the backoff of the last failure, newer colors replace the pending one meanwhile
+            wait_time = state.wait_time(time.monotonic())
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            if state.pending is None:
+                continue
+
+            hex_color = state.take()
+            start = time.perf_counter()
+            error = await self._post(channel, hex_color)
+            if error is None:
+                state.record_success(time.perf_counter() - start)
+            else:
+                channel.disconnect()
+                state.record_failure(hex_color, error)
+                channel.wakeup.set()
+
+    # Send one color to one device, returns the error message or None
+    async def _post(self, channel, hex_color):
+        try:
+            await asyncio.wait_for(self._request(channel, hex_color.encode()), self.timeout)
+        except asyncio.TimeoutError:
+            return f"Timeout error '{hex_color}'."
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            return f"Connection error ({e})."
+        return None
+
+    # Minimal HTTP/1.1 POST over the keep-alive connection of the device
+    async def _request(self, channel, body):
+        request = (
+            f"POST {channel.path} HTTP/1.1\r\n"
+            f"Host: {channel.host}\r\n"
+            "Content-Type: text/plain\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode() + body
+
+        reused = channel.writer is not None and not channel.writer.is_closing()
+        try:
+            await self._exchange(channel, request)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # The board may have closed an idle connection, try once more with a new one
+            if not reused:
+                raise
+            channel.disconnect()
+            await self._exchange(channel, request)
+
+    async def _exchange(self, channel, request):
+        if channel.writer is None or channel.writer.is_closing():
+            channel.reader, channel.writer = await asyncio.open_connection(channel.host, channel.port)
+            channel.connections += 1
+            sock = channel.writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        channel.writer.write(request)
+        await channel.writer.drain()
+
+        # Status line and headers
+        status_line = await channel.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by the device")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await channel.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip().lower()
+
+        # Body, without a length the device closes the connection at the end
+        if "content-length" in headers:
+            await channel.reader.readexactly(int(headers["content-length"]))
+        else:
+            await channel.reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection") == "close":
+            channel.disconnect()
+
+        if status >= 400:
+            raise ValueError(f"HTTP {status}")
+
+    # Get the counters of every device and the totals, with the same keys as ColorSender
+    def stats(self):
+        per_device = {channel.name: channel.stats() for channel in self.channels}
+        states = [channel.state for channel in self.channels]
+        sent = sum(state.sent for state in states)
+        total_latency = sum(state.total_latency for state in states)
+        return {
+            "devices": len(states),
+            "healthy": sum(state.is_connected for state in states),
+            "sent": sent,
+            "failed": sum(state.failed for state in states),
+            "coalesced": sum(state.coalesced for state in states),
+            "connected": all(state.is_connected for state in states),
+            "avg_latency_ms": (total_latency / sent * 1000) if sent else 0.0,
+            "max_latency_ms": max((state.max_latency for state in states), default=0.0) * 1000,
+            "per_device": per_device
+        }
+
+    # Wait until the healthy devices got the pending color (or the timeout expires) and stop the loop
+    def close(self, timeout=1.0):
+        if not self._running:
+            return
+
+        async def drain(deadline):
+            while time.monotonic() < deadline:
+                if not any((channel.state.pending is not None or channel.state.sending) and channel.state.is_connected
+                           for channel in self.channels):
+                    return
+                await asyncio.sleep(0.01)
+
+        deadline = time.monotonic() + timeout
+        future = asyncio.run_coroutine_threadsafe(drain(deadline), self._loop)
+        try:
+            future.result(timeout=timeout + self.timeout)
+        except Exception:
+            pass
+
+        self._loop.call_soon_threadsafe(self._stopped.set)
+        self._thread.join(timeout=self.timeout + 1.0)
+        self._thread = None
+        self._running = False
+
+# Function to get a local port where nothing is listening, used to simulate a dead board
+def closed_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Main code, load test against the registry or local simulated boards
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send colors to many ESP32 boards and report their health.")
+    parser.add_argument("--devices", help="Device registry (JSON), by default simulated boards are used")
+    parser.add_argument("--simulate", type=int, default=20, help="Number of simulated boards")
+    parser.add_argument("--slow", type=int, default=2, help="Simulated boards that answer after --slow-delay")
+    parser.add_argument("--slow-delay", type=float, default=2.0)
+    parser.add_argument("--dead", type=int, default=1, help="Devices that refuse every connection")
+    parser.add_argument("--rate", type=float, default=10.0, help="Colors per second")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    boards = []
+    if args.devices:
+        registry = devices.load_devices(args.devices)
+    else:
+        import esp32_simulator
+        boards = esp32_simulator.start_boards(args.simulate, slow=args.slow, slow_delay=args.slow_delay)
+        registry = [{"name": board.name, "url": board.url} for board in boards]
+        registry += [{"name": f"dead-{index}", "url": f"http://127.0.0.1:{closed_port()}/setColor"}
+                     for index in range(args.dead)]
+
+    color_sender = FanoutSender(registry, timeout=args.timeout).start()
+    print(f"Sending {args.rate:.0f} colors/s to {len(registry)} devices for {args.seconds:.0f} s...")
+    colors = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < args.seconds:
+        color_sender.send(f"#00{colors % 256:02X}00")
+        colors += 1
+        time.sleep(max(0.0, start + colors / args.rate - time.perf_counter()))
+    color_sender.close()
+
+    stats = color_sender.stats()
+    print(f"\n{'Device':<16} {'Healthy':>8} {'Sent':>6} {'Failed':>7} {'Coalesced':>10} {'Avg ms':>8} {'Max ms':>8}")
+    for name, device in stats["per_device"].items():
+        print(f"{name:<16} {str(device['connected']):>8} {device['sent']:>6} {device['failed']:>7} "
+              f"{device['coalesced']:>10} {device['avg_latency_ms']:>8.1f} {device['max_latency_ms']:>8.1f}")
+    print(f"\nColors: {colors}, healthy devices: {stats['healthy']}/{stats['devices']}, "
+          f"sent: {stats['sent']}, failed: {stats['failed']}, avg latency: {stats['avg_latency_ms']:.1f} ms")
+
+    for board in boards:
+        board.stop()
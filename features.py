@@ -0,0 +1,82 @@
+# Import libraries
+import numpy as np
+
+# Landmark names of MediaPipe Hands, in the same order as the model output
+LANDMARK_NAMES = [
+    "WRIST",
+    "THUMB_CMC", "THUMB_MCP", "THUMB_IP", "THUMB_TIP",
+    "INDEX_MCP", "INDEX_PIP", "INDEX_DIP", "INDEX_TIP",
+    "MIDDLE_MCP", "MIDDLE_PIP", "MIDDLE_DIP", "MIDDLE_TIP",
+    "RING_MCP", "RING_PIP", "RING_DIP", "RING_TIP",
+    "PINKY_MCP", "PINKY_PIP", "PINKY_DIP", "PINKY_TIP"
+]
+LANDMARK_INDEX = {name: index for index, name in enumerate(LANDMARK_NAMES)}
+NUM_LANDMARKS = len(LANDMARK_NAMES)
+
+# Function to convert a MediaPipe landmark list into a (21, 3) array in one pass
+def landmarks_to_array(hand_landmarks, out=None):
+    values = np.fromiter(
+        (value for point in hand_landmarks.landmark for value in (point.x, point.y, point.z)),
+        dtype=np.float64,
+        count=NUM_LANDMARKS * 3
+    )
+    if out is None:
+        return values.reshape(NUM_LANDMARKS, 3)
+    out.reshape(-1)[:] = values
+    return out
+
+# Class that defines which points are used as features and how they are normalized
+class FeatureSet:
+    def __init__(self, points, origin="WRIST", scale=("WRIST", "MIDDLE_MCP"), use_z=False):
+        self.points = list(points)
+        self.origin = origin
+        self.scale = tuple(scale)
+        self.use_z = use_z
+
+        # Indexes used by the vectorized math
+        self._indexes = np.array([LANDMARK_INDEX[name] for name in self.points])
+        self._origin = LANDMARK_INDEX[origin]
+        self._scale_from = LANDMARK_INDEX[self.scale[0]]
+        self._scale_to = LANDMARK_INDEX[self.scale[1]]
+        self._dims = 3 if use_z else 2
+
+        # Column names, for example "WRIST_X", "WRIST_Y"
+        axes = ["X", "Y", "Z"][:self._dims]
+        self.columns = [f"{name}_{axis}" for name in self.points for axis in axes]
+        self.n_features = len(self.columns)
+
+    # Normalize one hand with shape (21, 3), returns a vector with one value per column
+    def compute(self, landmarks, out=None):
+        landmarks = landmarks[:, :self._dims]
+
+        # Scale by the distance between the scale points, never divide by zero
+        scale = np.linalg.norm(landmarks[self._scale_to] - landmarks[self._scale_from])
+        if scale == 0:
+            scale = 1e-6
+
+        normalized = (landmarks[self._indexes] - landmarks[self._origin]) / scale
+        if out is None:
+            return normalized.reshape(-1)
+        out[:] = normalized.reshape(-1)
+        return out
+
+    # Normalize many hands with shape (n_hands, 21, 3), returns shape (n_hands, n_features)
+    def compute_batch(self, landmarks):
+        landmarks = np.asarray(landmarks)[:, :, :self._dims]
+
+        scale = np.linalg.norm(landmarks[:, self._scale_to] - landmarks[:, self._scale_from], axis=1)
+        scale[scale == 0] = 1e-6
+
+        normalized = (landmarks[:, self._indexes] - landmarks[:, self._origin, None]) / scale[:, None, None]
+        return normalized.reshape(len(landmarks), -1)
+
+# Points used by the trained model
+DEFAULT_FEATURES = FeatureSet(["WRIST", "THUMB_TIP", "INDEX_TIP", "MIDDLE_TIP"])
+FEATURE_COLUMNS = DEFAULT_FEATURES.columns
+
+# Other feature sets that can be used to record and train new models
+FEATURE_SETS = {
+    "default": DEFAULT_FEATURES,
+    "all_2d": FeatureSet(LANDMARK_NAMES),
+    "all_3d": FeatureSet(LANDMARK_NAMES, use_z=True)
+}
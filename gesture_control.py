@@ -0,0 +1,111 @@
+# Import libraries
+from collections import Counter, deque
+
+# Channel selected by every number gesture
+CHANNEL_GESTURES = {
+    "NUMBER_1": "red",
+    "NUMBER_2": "green",
+    "NUMBER_3": "blue"
+}
+
+# Direction of the gestures that change the selected channel
+RAMP_GESTURES = {
+    "THUMB_UP": 1,
+    "THUMB_DOWN": -1
+}
+
+# Class with the gesture logic: hold a gesture to select a channel, then raise or lower it
+# Every value is in seconds so it behaves the same at any frame rate, live or replayed
+class GestureController:
+    def __init__(self, delay_seconds=2, vote_seconds=0.3, vote_ratio=0.6, min_confidence=0.0,
+                 ramp_rate=30.0, max_step_seconds=0.25):
+        self.delay_seconds = delay_seconds
+        self.vote_seconds = vote_seconds
+        self.vote_ratio = vote_ratio
+        self.min_confidence = min_confidence
+        self.ramp_rate = ramp_rate
+        self.max_step_seconds = max_step_seconds
+
+        self.color = {"red": 0, "green": 0, "blue": 0}
+        self.selected_channel = None
+
+        # Gesture that won the vote and since when
+        self.last_prediction = None
+        self.prediction_start_time = None
+
+        # Ring buffer with the (time, prediction) of the last frames and the fraction of a step not applied yet
+        self._votes = deque()
+        self._last_update = None
+        self._ramp = 0.0
+
+    # Gesture of the vote window, another gesture only replaces the current one with a clear majority
+    def _vote(self):
+        if not self._votes:
+            return self.last_prediction
+        prediction, count = Counter(vote for _, vote in self._votes).most_common(1)[0]
+        if prediction == self.last_prediction or count >= self.vote_ratio * len(self._votes):
+            return prediction
+        return self.last_prediction
+
+    # Update the state with the prediction of a frame, "now" is the time of the frame in seconds
+    def update(self, prediction, now, confidence=None):
+        # Time since the last frame, long gaps (no hand, lag) do not jump the color
+        elapsed = 0.0 if self._last_update is None else min(max(now - self._last_update, 0.0), self.max_step_seconds)
+        self._last_update = now
+
+        # Unsure predictions do not vote
+        if confidence is None or confidence >= self.min_confidence:
+            self._votes.append((now, prediction))
+        while self._votes and now - self._votes[0][0] > self.vote_seconds:
+            self._votes.popleft()
+
+        gesture = self._vote()
+        if gesture != self.last_prediction:
+            self.last_prediction = gesture
+            self.prediction_start_time = now
+            self._ramp = 0.0
+            return
+
+        if gesture is None or now - self.prediction_start_time < self.delay_seconds:
+            return
+
+        if gesture in CHANNEL_GESTURES:
+            self.selected_channel = CHANNEL_GESTURES[gesture]
+        elif gesture in RAMP_GESTURES and self.selected_channel:
+            # Only the time after the activation moves the channel, at ramp_rate units per second
+            elapsed = min(elapsed, now - self.prediction_start_time - self.delay_seconds)
+            self._ramp += RAMP_GESTURES[gesture] * self.ramp_rate * elapsed
+            steps = int(self._ramp)
+            if steps:
+                self._ramp -= steps
+                value = self.color[self.selected_channel] + steps
+                self.color[self.selected_channel] = min(255, max(0, value))
+
+    # True when the current gesture was held long enough
+    @property
+    def active(self):
+        return (self.prediction_start_time is not None and self._last_update is not None
+                and self._last_update - self.prediction_start_time >= self.delay_seconds)
+
+    @property
+    def rgb(self):
+        return self.color["red"], self.color["green"], self.color["blue"]
+
+    @property
+    def hex_color(self):
+        return "#{:02X}{:02X}{:02X}".format(*self.rgb)
+
+# Class that limits how often a new color is sent
+class SendThrottle:
+    def __init__(self, interval_seconds=0.1):
+        self.interval_seconds = interval_seconds
+        self.last_sent_color = ""
+        self.last_sent_time = float("-inf")
+
+    # Check if the color changed and the interval expired, and save it as sent
+    def should_send(self, hex_color, now):
+        if hex_color == self.last_sent_color or now - self.last_sent_time < self.interval_seconds:
+            return False
+        self.last_sent_color = hex_color
+        self.last_sent_time = now
+        return True
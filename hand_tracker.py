@@ -0,0 +1,167 @@
+# Import libraries
+import cv2
+import features
+import numpy as np
+import time
+
+# Class that runs MediaPipe on a downscaled crop around the last hand and adapts the scale to hold a target FPS
+# Full frames go to the given Hands (video mode), crops to a static-image Hands: the video graph tracks the hand
+# from its position in the previous image, which is wrong when the next image is a crop with other coordinates
+class AdaptiveHandTracker:
+    def __init__(self, hands, target_fps=30.0, min_scale=0.35, max_scale=1.0, roi_padding=0.6,
+                 min_roi_size=160, scale_step=0.05, crop_hands=None):
+        self.hands = hands
+        self.crop_hands = crop_hands
+        self._owns_crop_hands = crop_hands is None
+        self.target_fps = target_fps
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.roi_padding = roi_padding
+        self.min_roi_size = min_roi_size
+        self.scale_step = scale_step
+
+        # Current state
+        self.scale = max_scale
+        self.roi = None
+        self._average_time = None
+        self._landmarks = np.empty((features.NUM_LANDMARKS, 3), dtype=np.float64)
+        self._resized = None
+
+        # Counters
+        self.frames = 0
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost = 0
+
+    # Find a hand in an RGB frame, returns a (21, 3) array normalized to the full frame or None
+    def process(self, frame_rgb):
+        start = time.perf_counter()
+        height, width = frame_rgb.shape[:2]
+        self.frames += 1
+
+        # Crop around the last hand, or search the whole frame
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            hands = self._crop_hands()
+            self.roi_frames += 1
+        else:
+            x0, y0, x1, y1 = 0, 0, width, height
+            hands = self.hands
+            self.full_frames += 1
+        crop = frame_rgb[y0:y1, x0:x1]
+
+        # Downscale the crop, small crops are not reduced below the minimum size
+        crop_height, crop_width = crop.shape[:2]
+        scale = max(self.scale, min(1.0, self.min_roi_size / max(1, min(crop_width, crop_height))))
+        if scale < 1.0:
+            size = (max(1, int(crop_width * scale)), max(1, int(crop_height * scale)))
+            if self._resized is None or self._resized.shape[1::-1] != size:
+                self._resized = np.empty((size[1], size[0], 3), dtype=np.uint8)
+            crop = cv2.resize(crop, size, dst=self._resized, interpolation=cv2.INTER_AREA)
+        else:
+            crop = np.ascontiguousarray(crop)
+
+        results = hands.process(crop)
+        landmarks = None
+        if results.multi_hand_landmarks:
+            landmarks = features.landmarks_to_array(results.multi_hand_landmarks[0], out=self._landmarks)
+
+            # Coordinates of the crop to coordinates of the full frame (z uses the same scale as x)
+            landmarks[:, 0] = (landmarks[:, 0] * (x1 - x0) + x0) / width
+            landmarks[:, 1] = (landmarks[:, 1] * (y1 - y0) + y0) / height
+            landmarks[:, 2] *= (x1 - x0) / width
+            self.roi = self._next_roi(landmarks, width, height)
+        else:
+            # Tracking lost, search the whole frame on the next one
+            if self.roi is not None:
+                self.lost += 1
+            self.roi = None
+
+        self._adapt(time.perf_counter() - start)
+        return landmarks
+
+    # Static-image Hands for the crops, created on the first crop
+    def _crop_hands(self):
+        if self.crop_hands is None:
+            import mediapipe as mp
+            self.crop_hands = mp.solutions.hands.Hands(static_image_mode=True, max_num_hands=1,
+                                                       min_detection_confidence=0.5)
+        return self.crop_hands
+
+    # Padded square box around the landmarks in pixels
+    def _next_roi(self, landmarks, width, height):
+        xs, ys = landmarks[:, 0] * width, landmarks[:, 1] * height
+        size = max(xs.max() - xs.min(), ys.max() - ys.min()) * (1 + 2 * self.roi_padding)
+        size = max(size, self.min_roi_size)
+        center_x, center_y = (xs.max() + xs.min()) / 2, (ys.max() + ys.min()) / 2
+
+        x0 = int(max(0, center_x - size / 2))
+        y0 = int(max(0, center_y - size / 2))
+        x1 = int(min(width, center_x + size / 2))
+        y1 = int(min(height, center_y + size / 2))
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            return None
+        return x0, y0, x1, y1
+
+    # Lower the scale when processing is slower than the target FPS and raise it when there is time left
+    def _adapt(self, seconds):
+        if self._average_time is None:
+            self._average_time = seconds
+        else:
+            self._average_time = 0.9 * self._average_time + 0.1 * seconds
+
+        budget = 1.0 / self.target_fps
+        if self._average_time > budget:
+            self.scale = max(self.min_scale, self.scale - self.scale_step)
+        elif self._average_time < 0.7 * budget:
+            self.scale = min(self.max_scale, self.scale + self.scale_step)
+
+    def stats(self):
+        return {
+            "scale": self.scale,
+            "roi_frames": self.roi_frames,
+            "full_frames": self.full_frames,
+            "tracking_lost": self.lost,
+            "avg_process_ms": (self._average_time or 0.0) * 1000
+        }
+
+    # Close the Hands created for the crops, the full-frame one belongs to the caller
+    def close(self):
+        if self._owns_crop_hands and self.crop_hands is not None:
+            self.crop_hands.close()
+            self.crop_hands = None
+
+# Check on a recorded video: with a hand in view, most frames should be crops and the hand should rarely be lost
+if __name__ == "__main__":
+    import argparse
+    import mediapipe as mp
+
+    parser = argparse.ArgumentParser(description="Run the adaptive tracker on a recorded video and report how it tracked.")
+    parser.add_argument("video", help="Video with one hand in view")
+    parser.add_argument("--target-fps", type=float, default=30.0)
+    parser.add_argument("--min-roi-share", type=float, default=0.8, help="Share of crop frames expected")
+    args = parser.parse_args()
+
+    cap = cv2.VideoCapture(args.video)
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=1, min_detection_confidence=0.5)
+    tracker = AdaptiveHandTracker(hands, target_fps=args.target_fps)
+    detected = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        if tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)) is not None:
+            detected += 1
+    cap.release()
+    tracker.close()
+    hands.close()
+
+    stats = tracker.stats()
+    roi_share = stats["roi_frames"] / max(1, tracker.frames)
+    print(f"Frames: {tracker.frames}, hand found: {detected}, ROI frames: {stats['roi_frames']}, "
+          f"full frames: {stats['full_frames']}, tracking lost: {stats['tracking_lost']}, "
+          f"scale: {stats['scale']:.2f}, avg: {stats['avg_process_ms']:.1f} ms")
+    if roi_share < args.min_roi_share:
+        print(f"⚠️ Only {roi_share * 100:.0f}% of the frames were crops, the tracking does not stay on the hand.")
+        raise SystemExit(1)
+    print(f"Tracking stayed on the crop for {roi_share * 100:.0f}% of the frames.")
@@ -0,0 +1,89 @@
+# Import libraries
+import copy
+import joblib
+import numpy as np
+import os
+import time
+import tree_runtime
+from features import FEATURE_COLUMNS
+
+# Class that predicts gestures from NumPy feature vectors without building DataFrames
+class GestureClassifier:
+    def __init__(self, model, columns=FEATURE_COLUMNS):
+        # Verify the column order only once, when the model is loaded
+        model_columns = getattr(model, "feature_names_in_", None)
+        if model_columns is not None:
+            if list(model_columns) != list(columns):
+                raise ValueError(f"The model expects the columns {list(model_columns)} but got {list(columns)}.")
+
+            # The order is already verified, so sklearn does not need to check names on every call
+            # A shallow copy keeps the names on the caller's model, e.g. train_model.py saves it afterwards
+            model = copy.copy(model)
+            del model.feature_names_in_
+
+        self.model = model
+        self.columns = list(columns)
+        self.classes = model.classes_
+        self.n_features = len(self.columns)
+
+        # Reusable one-row input for single predictions
+        self._row = np.empty((1, self.n_features), dtype=np.float64)
+
+    # Predict one sample, returns the label and the probability of each class
+    def predict(self, features):
+        self._row[0] = features
+        probabilities = self.model.predict_proba(self._row)[0]
+        return self.classes[probabilities.argmax()], probabilities
+
+    # Predict a batch of samples with shape (n_samples, n_features)
+    def predict_batch(self, features):
+        probabilities = self.model.predict_proba(np.asarray(features, dtype=np.float64))
+        return self.classes[probabilities.argmax(axis=1)], probabilities
+
+# Function to load a trained model from disk, exported ".npz" models do not need sklearn
+def load_classifier(model_path, columns=FEATURE_COLUMNS):
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"The model file '{model_path}' was not found.")
+
+    if model_path.endswith(".npz"):
+        classifier = tree_runtime.load_compiled(model_path)
+        if classifier.columns != list(columns):
+            raise ValueError(f"The model expects the columns {classifier.columns} but got {list(columns)}.")
+        return classifier
+    return GestureClassifier(joblib.load(model_path), columns)
+
+# Micro-benchmark against the DataFrame path used before
+if __name__ == "__main__":
+    import pandas as pd
+
+    model_path = "gesture_model.joblib"
+    dataset_path = "gestures_dataset.csv"
+    repeats = 500
+
+    # Rows to replay
+    samples = pd.read_csv(dataset_path)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)[:repeats]
+    dataframe_model = joblib.load(model_path)
+    classifier = load_classifier(model_path)
+
+    # One-row DataFrame per prediction
+    start = time.perf_counter()
+    for sample in samples:
+        dataframe_model.predict(pd.DataFrame([sample], columns=FEATURE_COLUMNS))[0]
+    dataframe_time = (time.perf_counter() - start) / len(samples)
+
+    # Preallocated NumPy vector per prediction
+    features = np.empty(len(FEATURE_COLUMNS), dtype=np.float64)
+    start = time.perf_counter()
+    for sample in samples:
+        features[:] = sample
+        classifier.predict(features)
+    numpy_time = (time.perf_counter() - start) / len(samples)
+
+    # Whole batch at once
+    start = time.perf_counter()
+    classifier.predict_batch(samples)
+    batch_time = (time.perf_counter() - start) / len(samples)
+
+    print(f"DataFrame predict: {dataframe_time * 1e6:.1f} us/sample")
+    print(f"NumPy predict:     {numpy_time * 1e6:.1f} us/sample ({dataframe_time / numpy_time:.1f}x)")
+    print(f"NumPy batch:       {batch_time * 1e6:.1f} us/sample ({dataframe_time / batch_time:.1f}x)")
@@ -1,48 +1,50 @@
 # Import libraries
+import argparse
+import dataset_store
 import os
-import pandas as pd
-
-# Folder to get the "datasets"
-datasets_folder = os.path.join(os.getcwd(), "datasets")
-
-# List of files to combine
-files_to_combine = [
-    "NUMBER_1.csv",
-    "NUMBER_2.csv",
-    "NUMBER_3.csv",
-    "THUMB_UP.csv",
-    "THUMB_DOWN.csv"
-]
-
-# List to hold all DataFrames
-all_dataframes = []
-
-# Loop through each file, read it, and add to the list
-for index, filename in enumerate(files_to_combine):
-    # Get the file path
-    file_path = os.path.join(datasets_folder, filename)
-
-    # Check if the file exists before trying to read it
-    if not os.path.exists(file_path):
-        # Skip to the next file if not found
-        print(f"⚠️ Warning: File not found - {file_path}. Skipping.")
-        continue
-
-    # Convert file to a dataframe
-    df = pd.read_csv(file_path, header = 0)
-    all_dataframes.append(df)
-
-# Check if any dataframes were loaded
-if not all_dataframes:
-    print("No datasets were loaded. Cannot combine anything.")
-else:
-    # Concatenate all DataFrames into one
-    combined_dataset = pd.concat(all_dataframes, ignore_index=True)
-
-    # Define the output file path in the project root
-    output_filename = "gestures_dataset.csv"
-    output_path = os.path.join(os.getcwd(), output_filename)
-
-    # Save the final combined dataset
-    combined_dataset.to_csv(output_path, index=False)
-    print(f"Combined dataset saved to: {output_path}")
+from features import FEATURE_COLUMNS
+
+# Function to find every label file inside the datasets folder (including subfolders like "augmented")
+def find_label_files(datasets_folder):
+    label_files = []
+    for root, _, files in os.walk(datasets_folder):
+        for filename in sorted(files):
+            if filename.endswith(".csv"):
+                label_files.append(os.path.join(root, filename))
+    return sorted(label_files)
+
+# Function to merge the label files into one binary store
+def merge_datasets(label_files, store_path, columns=FEATURE_COLUMNS):
+    writer = dataset_store.StoreWriter(store_path, columns)
+    for file_path in label_files:
+        rows_before = writer.rows
+        checkpoint = writer.checkpoint()
+        try:
+            for samples, labels in dataset_store.read_csv_chunks(file_path, columns):
+                writer.write(samples, labels)
+        except (ValueError, IndexError) as e:
+            # Skip files without the feature columns or with invalid values, including the chunks already written
+            writer.rollback(checkpoint)
+            print(f"⚠️ Warning: Could not read {file_path} ({e}). Skipping.")
+            continue
+        print(f"{file_path}: {writer.rows - rows_before} rows")
+
+    writer.close()
+    return writer
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merge every label file into one binary dataset store.")
+    parser.add_argument("--datasets-folder", default=os.path.join(os.getcwd(), "datasets"))
+    parser.add_argument("--output", default=os.path.join(os.getcwd(), "gestures_dataset_store"))
+    args = parser.parse_args()
+
+    # Find the label files, adding a new gesture only needs a new file
+    label_files = find_label_files(args.datasets_folder)
+    if not label_files:
+        print("No datasets were loaded. Cannot combine anything.")
+        exit()
+
+    writer = merge_datasets(label_files, args.output)
+    print(f"Combined dataset saved to: {args.output} "
+          f"({writer.rows} rows, {writer.duplicates} duplicates removed, labels: {', '.join(writer.label_names)})")
@@ -0,0 +1,131 @@
+# Import libraries
+import cv2
+import json
+import numpy as np
+import os
+import time
+
+# Class that times every stage of a frame and keeps a rolling window of the last samples
+class StageTimer:
+    def __init__(self, window=300):
+        self.window = window
+        self.stages = []
+        self._samples = {}
+        self._counts = {}
+        self._frame_start = None
+        self._last_mark = None
+        self._frame_ends = np.zeros(window)
+        self.frames = 0
+
+    # Start timing a new frame
+    def begin_frame(self):
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last_mark = now
+
+    # Save the time since the last mark as the duration of a stage
+    def lap(self, stage):
+        now = time.perf_counter()
+        self._record(stage, now - self._last_mark)
+        self._last_mark = now
+
+    # Finish the frame, its total duration is saved as the "frame" stage
+    def end_frame(self):
+        now = time.perf_counter()
+        self._record("frame", now - self._frame_start)
+        self._frame_ends[self.frames % self.window] = now
+        self.frames += 1
+
+    def _record(self, stage, seconds):
+        if stage not in self._samples:
+            self.stages.append(stage)
+            self._samples[stage] = np.zeros(self.window)
+            self._counts[stage] = 0
+        self._samples[stage][self._counts[stage] % self.window] = seconds
+        self._counts[stage] += 1
+
+    # Frames per second over the rolling window
+    def fps(self):
+        filled = min(self.frames, self.window)
+        if filled < 2:
+            return 0.0
+        ends = self._frame_ends[:filled]
+        elapsed = ends.max() - ends.min()
+        return (filled - 1) / elapsed if elapsed > 0 else 0.0
+
+    # Percentiles of every stage in milliseconds
+    def summary(self, percentiles=(50, 90, 99)):
+        result = {}
+        for stage in self.stages:
+            filled = min(self._counts[stage], self.window)
+            values = np.percentile(self._samples[stage][:filled], percentiles) * 1000
+            result[stage] = {f"p{percentile}": float(value) for percentile, value in zip(percentiles, values)}
+            result[stage]["count"] = self._counts[stage]
+        return result
+
+# Function to draw the FPS and the latency of every stage on a frame
+def draw_overlay(frame, timer, origin=(10, 110)):
+    x, y = origin
+    cv2.putText(frame, f"FPS: {timer.fps():.1f}", (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+    for stage, values in timer.summary((50, 99)).items():
+        y += 18
+        cv2.putText(frame, f"{stage}: {values['p50']:.1f} / {values['p99']:.1f} ms", (x, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+
+# Class that writes the metrics to a JSON file or a Prometheus textfile every few seconds
+class MetricsExporter:
+    def __init__(self, path, file_format="json", interval=10.0, prefix="lightsign"):
+        self.path = path
+        self.file_format = file_format
+        self.interval = interval
+        self.prefix = prefix
+        self._next_export = time.monotonic() + interval
+
+    # Export if the interval expired, extra counters (e.g. capture or sender stats) are included
+    def maybe_export(self, timer, extra=None):
+        now = time.monotonic()
+        if now < self._next_export:
+            return False
+        self._next_export = now + self.interval
+        self.export(timer, extra)
+        return True
+
+    def export(self, timer, extra=None):
+        if self.file_format == "prometheus":
+            content = self._prometheus(timer, extra or {})
+        else:
+            content = json.dumps({
+                "timestamp": time.time(),
+                "fps": timer.fps(),
+                "stages_ms": timer.summary(),
+                **(extra or {})
+            }, indent=2)
+
+        # Write to a temporary file first so readers never see a half-written file
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as handle:
+            handle.write(content)
+        os.replace(tmp_path, self.path)
+
+    def _prometheus(self, timer, extra):
+        lines = [
+            f"# TYPE {self.prefix}_fps gauge",
+            f"{self.prefix}_fps {timer.fps():.3f}",
+            f"# TYPE {self.prefix}_stage_latency_ms gauge"
+        ]
+        for stage, values in timer.summary().items():
+            for name, value in values.items():
+                if name == "count":
+                    continue
+                quantile = int(name[1:]) / 100
+                lines.append(f'{self.prefix}_stage_latency_ms{{stage="{stage}",quantile="{quantile}"}} {value:.3f}')
+
+        # Numeric counters of other components, e.g. {"capture": {"frames_dropped": 3}}
+        for group, values in extra.items():
+            for name, value in values.items():
+                if isinstance(value, (bool, int, float)):
+                    lines.append(f"{self.prefix}_{group}_{name} {float(value):.3f}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,82 @@
+# Import libraries
+import numpy as np
+import os
+import threading
+import warmup
+
+# Class that watches the model files and loads a new version on a background thread
+# The vision loop only swaps the reference with poll(), so no frame waits for the loading
+class ModelWatcher:
+    def __init__(self, model_path, interval=1.0, model_paths=warmup.MODEL_PATHS):
+        self.model_path = model_path
+        self.model_paths = list(model_paths)
+        self.interval = interval
+        self._signature = self._files_signature()
+        self._lock = threading.Lock()
+        self._pending = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+        # Counters
+        self.reloads = 0
+        self.failures = 0
+
+    # The model is saved with os.replace, so a new version is a new file
+    # Every model file is watched, e.g. a search can replace the ".joblib" and remove the ".npz"
+    def _files_signature(self):
+        signature = []
+        for model_path in self.model_paths:
+            try:
+                stat = os.stat(model_path)
+                signature.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+            except FileNotFoundError:
+                signature.append(None)
+        return tuple(signature)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ModelWatcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        import inference
+        while not self._stop_event.wait(self.interval):
+            signature = self._files_signature()
+            if signature == self._signature:
+                continue
+            self._signature = signature
+
+            # Same choice as a restart would make
+            model_path = warmup.find_model_path(self.model_paths)
+            if model_path is None:
+                print(f"⚠️ Warning: The model file '{self.model_path}' was removed. Keeping the current model.")
+                continue
+
+            # Load and warm up the new model before the loop can use it
+            try:
+                classifier = inference.load_classifier(model_path)
+                classifier.predict(np.zeros(classifier.n_features, dtype=np.float64))
+            except Exception as e:
+                self.failures += 1
+                print(f"⚠️ Warning: Could not reload the model '{model_path}' ({e}). Keeping the current one.")
+                continue
+
+            with self._lock:
+                self._pending = classifier
+                self.model_path = model_path
+
+    # Get the new classifier if one was loaded since the last call, otherwise None
+    def poll(self):
+        if self._pending is None:
+            return None
+        with self._lock:
+            classifier, self._pending = self._pending, None
+        if classifier is not None:
+            self.reloads += 1
+        return classifier
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
@@ -0,0 +1,72 @@
+# Import libraries
+import numpy as np
+from collections import OrderedDict
+
+# Class that reuses predictions while the hand does not move, with the same API as the classifiers
+class PredictionCache:
+    def __init__(self, classifier, quantization=0.05, motion_threshold=0.02, max_size=512):
+        self.classifier = classifier
+        self.classes = classifier.classes
+        self.n_features = classifier.n_features
+        self.quantization = quantization
+        self.motion_threshold = motion_threshold
+        self.max_size = max_size
+
+        # Last prediction and least recently used cache of quantized features
+        self._last_features = np.full(self.n_features, np.nan)
+        self._last_result = None
+        self._cache = OrderedDict()
+
+        # Counters
+        self.motion_hits = 0
+        self.cache_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # Predict one sample, returns the label and the probability of each class
+    def predict(self, features):
+        # The hand barely moved since the last frame, reuse the last prediction
+        if self._last_result is not None:
+            if np.max(np.abs(features - self._last_features)) < self.motion_threshold:
+                self.motion_hits += 1
+                return self._last_result
+
+        # Same quantized features seen before
+        key = np.round(np.asarray(features) / self.quantization).astype(np.int32).tobytes()
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            label, probabilities = self.classifier.predict(features)
+            result = (label, probabilities.copy())
+            self._cache[key] = result
+            self.misses += 1
+            if len(self._cache) > self.max_size:
+                self._cache.popitem(last=False)
+                self.evictions += 1
+
+        self._last_features[:] = features
+        self._last_result = result
+        return result
+
+    # Batches are not cached
+    def predict_batch(self, features):
+        return self.classifier.predict_batch(features)
+
+    # Forget everything, e.g. after loading a new model
+    def clear(self):
+        self._cache.clear()
+        self._last_result = None
+        self._last_features[:] = np.nan
+
+    def stats(self):
+        total = self.motion_hits + self.cache_hits + self.misses
+        return {
+            "motion_hits": self.motion_hits,
+            "cache_hits": self.cache_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._cache),
+            "hit_rate": (self.motion_hits + self.cache_hits) / total if total else 0.0
+        }
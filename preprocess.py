@@ -0,0 +1,34 @@
+# Import libraries
+import cv2
+import numpy as np
+
+# Class that prepares camera frames for MediaPipe reusing the same output buffers on every frame
+class FramePreprocessor:
+    def __init__(self, flip_image=True):
+        # When the image is not flipped, the landmarks are mirrored instead
+        self.flip_image = flip_image
+        self._mirrored = None
+        self._rgb = None
+
+    # Allocate a buffer only when the frame size changes
+    @staticmethod
+    def _buffer(buffer, frame):
+        if buffer is None or buffer.shape != frame.shape:
+            return np.empty_like(frame)
+        return buffer
+
+    # Get the frame to show (mirrored if flip_image is used) and the RGB frame for MediaPipe
+    def process(self, frame):
+        if self.flip_image:
+            self._mirrored = self._buffer(self._mirrored, frame)
+            frame = cv2.flip(frame, 1, dst=self._mirrored)
+
+        self._rgb = self._buffer(self._rgb, frame)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb)
+        return frame, self._rgb
+
+    # Mirror the x coordinate of a (21, 3) landmark array in place when the image was not flipped
+    def fix_landmarks(self, landmarks):
+        if not self.flip_image:
+            np.subtract(1.0, landmarks[:, 0], out=landmarks[:, 0])
+        return landmarks
@@ -0,0 +1,114 @@
+# Import libraries
+import argparse
+import features
+import numpy as np
+import session_log
+import time
+from gesture_control import GestureController, SendThrottle
+
+# Class that feeds a recorded session through the gesture logic and the sender without a camera
+class ReplayEngine:
+    def __init__(self, labels, records, controller, send=None, classifier=None,
+                 send_interval=0.1, realtime=False, feature_set=features.DEFAULT_FEATURES):
+        self.labels = np.asarray(labels, dtype=object)
+        self.records = records
+        self.controller = controller
+        self.send = send
+        self.classifier = classifier
+        self.throttle = SendThrottle(send_interval)
+        self.realtime = realtime
+        self.feature_set = feature_set
+
+    # Get the prediction and confidence of every record, recorded or computed again with another model
+    # Recorded predictions have no confidence
+    def predictions(self):
+        hands = self.records["hand"].astype(bool)
+        predictions = np.full(len(self.records), None, dtype=object)
+        confidences = np.full(len(self.records), None, dtype=object)
+        if self.classifier is None:
+            codes = self.records["prediction"]
+            valid = hands & (codes != session_log.NO_PREDICTION)
+            predictions[valid] = self.labels[codes[valid]]
+        elif hands.any():
+            # Every frame with a hand is predicted in one batch
+            samples = self.feature_set.compute_batch(np.asarray(self.records["landmarks"][hands], dtype=np.float64))
+            predictions[hands], probabilities = self.classifier.predict_batch(samples)
+            confidences[hands] = probabilities.max(axis=1)
+        return predictions, confidences
+
+    # Replay every record, the recorded timestamps are used as the clock so the result is deterministic
+    def run(self):
+        start_wall = time.perf_counter()
+        timestamps = np.asarray(self.records["timestamp"])
+        predictions, confidences = self.predictions()
+        colors_sent = 0
+
+        first_timestamp = timestamps[0] if len(timestamps) else 0.0
+        replay_start = time.perf_counter()
+        for timestamp, prediction, confidence in zip(timestamps.tolist(), predictions.tolist(), confidences.tolist()):
+            # Wait until the frame time when replaying at real speed
+            if self.realtime:
+                delay = (timestamp - first_timestamp) - (time.perf_counter() - replay_start)
+                if delay > 0:
+                    time.sleep(delay)
+
+            if prediction is not None:
+                self.controller.update(prediction, timestamp, confidence)
+
+            hex_color = self.controller.hex_color
+            if self.throttle.should_send(hex_color, timestamp):
+                colors_sent += 1
+                if self.send is not None:
+                    self.send(hex_color)
+
+        elapsed = time.perf_counter() - start_wall
+        return {
+            "frames": len(timestamps),
+            "hands": int(np.count_nonzero(self.records["hand"])),
+            "session_seconds": float(timestamps[-1] - first_timestamp) if len(timestamps) else 0.0,
+            "replay_seconds": elapsed,
+            "fps": len(timestamps) / elapsed if elapsed > 0 else 0.0,
+            "colors_sent": colors_sent,
+            "final_color": self.controller.hex_color,
+            "selected_channel": self.controller.selected_channel
+        }
+
+# Main code
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded session without a camera or MediaPipe.")
+    parser.add_argument("session", help="File recorded with 'detection.py --record'")
+    parser.add_argument("--realtime", action="store_true", help="Replay at the recorded speed instead of max speed")
+    parser.add_argument("--model", help="Predict again with this model instead of the recorded predictions")
+    parser.add_argument("--send-url", help="Send the colors to this endpoint, e.g. http://192.168.4.1/setColor")
+    parser.add_argument("--delay-seconds", type=float, default=2)
+    parser.add_argument("--vote-seconds", type=float, default=0.3, help="Window of the majority vote of the gestures")
+    parser.add_argument("--ramp-rate", type=float, default=30.0, help="Channel units per second while a thumb is held")
+    parser.add_argument("--send-interval", type=float, default=0.1)
+    args = parser.parse_args()
+
+    labels, records = session_log.load_session(args.session)
+
+    classifier = None
+    if args.model:
+        import inference
+        classifier = inference.load_classifier(args.model)
+
+    color_sender = None
+    if args.send_url:
+        import sender
+        color_sender = sender.ColorSender(args.send_url)
+
+    engine = ReplayEngine(
+        labels, records, GestureController(args.delay_seconds, vote_seconds=args.vote_seconds, ramp_rate=args.ramp_rate),
+        send=color_sender.send if color_sender else None,
+        classifier=classifier,
+        send_interval=args.send_interval,
+        realtime=args.realtime
+    )
+    stats = engine.run()
+    for name, value in stats.items():
+        print(f"{name}: {value}")
+
+    if color_sender is not None:
+        color_sender.close()
+        print(f"sender: {color_sender.stats()}")
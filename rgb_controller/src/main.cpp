@@ -2,6 +2,7 @@
 #include <Arduino.h>
 #include <WiFi.h>
 #include <WebServer.h>
+#include <WiFiUdp.h>
 
 // RGB pins
 const int RED_PIN = 23;
@@ -15,10 +16,26 @@ const char *password = "rgbcontroller";
 // Create a web server object on port 80 (standard HTTP port)
 WebServer server(80);
 
+// Binary color datagrams: "LS", version, sequence (uint32, big endian), red, green, blue
+const uint16_t UDP_PORT = 4210;
+const size_t PACKET_SIZE = 10;
+const uint8_t PROTOCOL_VERSION = 1;
+const unsigned long SEQUENCE_RESET_MS = 2000;
+WiFiUDP udp;
+
+// Last accepted datagram, older ones are dropped
+bool hasSequence = false;
+uint32_t lastSequence = 0;
+IPAddress lastSender;
+uint16_t lastSenderPort = 0;
+unsigned long lastPacketTime = 0;
+
 // Define functions
 void changeColor(const char *);
+void setColor(int r, int g, int b);
 void handleColorChange();
 void handleNotFound();
+void handleDatagram();
 
 void setup()
 {
@@ -54,6 +71,10 @@ void setup()
   server.begin();
   Serial.println("HTTP server started");
 
+  // Start the UDP listener
+  udp.begin(UDP_PORT);
+  Serial.printf("UDP listener started on port %d\n", UDP_PORT);
+
   // Turn off the LED
   changeColor("#000000");
 }
@@ -62,6 +83,9 @@ void loop()
 {
   // Handle incoming HTTP requests
   server.handleClient();
+
+  // Handle incoming datagrams
+  handleDatagram();
 }
 
 // Function that changes the RGB Led using an HEX Color
@@ -82,7 +106,12 @@ void changeColor(const char *hexColor)
   // Show values on console
   Serial.printf("Color: R=%d, G=%d, B=%d\n", r, g, b);
 
-  // Send values to the LED
+  setColor(r, g, b);
+}
+
+// Function that sends the values to the LED
+void setColor(int r, int g, int b)
+{
   ledcWrite(0, r);
   ledcWrite(1, g);
   ledcWrite(2, b);
@@ -110,6 +139,45 @@ void handleColorChange()
   }
 }
 
+// Handler for the binary color datagrams, applies only the newest sequence
+void handleDatagram()
+{
+  // Read every pending datagram
+  int size;
+  while ((size = udp.parsePacket()) > 0)
+  {
+    uint8_t packet[PACKET_SIZE];
+    if (size != PACKET_SIZE || udp.read(packet, PACKET_SIZE) != PACKET_SIZE)
+    {
+      udp.flush();
+      continue;
+    }
+    if (packet[0] != 'L' || packet[1] != 'S' || packet[2] != PROTOCOL_VERSION)
+    {
+      continue;
+    }
+
+    uint32_t sequence = ((uint32_t)packet[3] << 24) | ((uint32_t)packet[4] << 16) |
+                        ((uint32_t)packet[5] << 8) | (uint32_t)packet[6];
+
+    // A new sender or a long silence starts a new sequence, otherwise drop old and repeated datagrams
+    unsigned long now = millis();
+    bool restarted = !hasSequence || udp.remoteIP() != lastSender || udp.remotePort() != lastSenderPort ||
+                     now - lastPacketTime > SEQUENCE_RESET_MS;
+    if (!restarted && (int32_t)(sequence - lastSequence) <= 0)
+    {
+      continue;
+    }
+
+    hasSequence = true;
+    lastSequence = sequence;
+    lastSender = udp.remoteIP();
+    lastSenderPort = udp.remotePort();
+    lastPacketTime = now;
+    setColor(packet[7], packet[8], packet[9]);
+  }
+}
+
 // Handler for undefined routes
 void handleNotFound()
 {
@@ -0,0 +1,187 @@
+# Import libraries
+import requests
+import threading
+import time
+from requests.adapters import HTTPAdapter
+
+# Class with the delivery state of one device: the pending color slot, the retry backoff and the counters
+# Callers handle the locking, ColorSender with its condition and FanoutSender with its event loop
+class DeliveryState:
+    def __init__(self, min_backoff=0.5, max_backoff=5.0, name=None):
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.name = name
+
+        # Pending color slot, a new color replaces the one that was not sent yet
+        self.pending = None
+        self.sending = False
+        self.backoff = 0.0
+        self.next_attempt = 0.0
+
+        # Health and counters
+        self.is_connected = True
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.total_latency = 0.0
+
+    # Queue a color, replacing the pending one
+    def offer(self, hex_color):
+        if self.pending is not None:
+            self.coalesced += 1
+        self.pending = hex_color
+
+    # Seconds until the backoff of the last failure expires
+    def wait_time(self, now):
+        return self.next_attempt - now
+
+    # Take the pending color to send it
+    def take(self):
+        hex_color = self.pending
+        self.pending = None
+        self.sending = True
+        return hex_color
+
+    def record_success(self, latency):
+        self.sending = False
+        self.backoff = 0.0
+        self.next_attempt = 0.0
+        if not self.is_connected:
+            print("Connection with ESP32 restored." if self.name is None else f"Connection with '{self.name}' restored.")
+        self.is_connected = True
+        self.consecutive_failures = 0
+        self.sent += 1
+        self.last_latency = latency
+        self.max_latency = max(self.max_latency, latency)
+        self.total_latency += latency
+
+    # Retry the same color later unless a newer one arrived meanwhile, waiting longer after every failure
+    def record_failure(self, hex_color, message):
+        self.sending = False
+        self.failed += 1
+        self.consecutive_failures += 1
+        self.last_error = message
+
+        # Only print the first error of a disconnection to avoid flooding the console
+        if self.is_connected:
+            print(message if self.name is None else f"Device '{self.name}': {message}")
+        self.is_connected = False
+
+        if self.pending is None:
+            self.pending = hex_color
+        self.backoff = min(self.max_backoff, max(self.min_backoff, self.backoff * 2))
+        self.next_attempt = time.monotonic() + self.backoff
+
+    # Get the counters
+    def stats(self):
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "coalesced": self.coalesced,
+            "connected": self.is_connected,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error,
+            "last_latency_ms": self.last_latency * 1000,
+            "avg_latency_ms": (self.total_latency / self.sent * 1000) if self.sent else 0.0,
+            "max_latency_ms": self.max_latency * 1000
+        }
+
+# Class that sends colors to the ESP32 on a background thread, always the latest one
+class ColorSender:
+    def __init__(self, endpoint_url, timeout=0.5, min_backoff=0.5, max_backoff=5.0):
+        self.endpoint_url = endpoint_url
+        self.timeout = timeout
+
+        # One keep-alive connection reused by every request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0)
+        self.session.mount("http://", adapter)
+
+        # Pending color, backoff and counters, guarded by the condition
+        self.state = DeliveryState(min_backoff, max_backoff)
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    # Start the sender thread
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="ColorSender", daemon=True)
+        self._thread.start()
+        return self
+
+    # Queue a color without blocking, returns immediately
+    def send(self, hex_color):
+        if not self._running:
+            self.start()
+        with self._condition:
+            self.state.offer(hex_color)
+            self._condition.notify_all()
+
+    # Sender loop
+    def _worker(self):
+        state = self.state
+        while True:
+            with self._condition:
+                # Wait for a color and for the backoff of the last failure to expire
+                while self._running:
+                    wait_time = state.wait_time(time.monotonic())
+                    if state.pending is not None and wait_time <= 0:
+                        break
+                    self._condition.wait(timeout=wait_time if state.pending is not None else None)
+                if not self._running:
+                    return
+                hex_color = state.take()
+
+            start = time.perf_counter()
+            error = self._post(hex_color)
+            latency = time.perf_counter() - start
+
+            with self._condition:
+                if error is None:
+                    state.record_success(latency)
+                else:
+                    state.record_failure(hex_color, error)
+                self._condition.notify_all()
+
+    # Send one color, returns the error message or None
+    def _post(self, hex_color):
+        try:
+            response = self.session.post(self.endpoint_url, data=hex_color, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.exceptions.Timeout:
+            return f"Timeout error '{hex_color}'. Verify the connection with ESP32."
+        except requests.exceptions.ConnectionError:
+            return "Connection error ESP32. Verify access point."
+        except requests.exceptions.RequestException as e:
+            return f"Error while changing the color '{hex_color}': {e}"
+        return None
+
+    # Get the counters of the sender
+    def stats(self):
+        with self._condition:
+            return self.state.stats()
+
+    # Wait until the pending color is sent (or the timeout expires) and stop the thread
+    def close(self, timeout=1.0):
+        deadline = time.monotonic() + timeout
+        state = self.state
+        with self._condition:
+            while self._running and (state.pending is not None or state.sending) and state.is_connected:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(timeout=remaining)
+            self._running = False
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout=max(0.0, deadline - time.monotonic()) + self.timeout)
+            self._thread = None
+        self.session.close()
@@ -0,0 +1,74 @@
+# Import libraries
+import json
+import numpy as np
+import os
+import struct
+from features import NUM_LANDMARKS
+
+# File format: magic, header length, JSON header and fixed-size records until the end of the file
+MAGIC = b"LSREC\x00\x01\x00"
+RECORD_DTYPE = np.dtype([
+    ("timestamp", "<f8"),
+    ("hand", "u1"),
+    ("prediction", "<i2"),
+    ("landmarks", "<f4", (NUM_LANDMARKS, 3))
+])
+NO_PREDICTION = -1
+
+# Class that appends timestamped landmarks and predictions to a binary session file
+class SessionRecorder:
+    def __init__(self, path, labels, batch_size=256):
+        self.path = path
+        self.labels = list(labels)
+        self._label_codes = {label: code for code, label in enumerate(self.labels)}
+        self._buffer = np.zeros(batch_size, dtype=RECORD_DTYPE)
+        self._count = 0
+        self.records = 0
+
+        # Header with the labels, the records only save the label code
+        header = json.dumps({"labels": self.labels, "record_size": RECORD_DTYPE.itemsize}).encode()
+        self._handle = open(path, "wb")
+        self._handle.write(MAGIC + struct.pack("<I", len(header)) + header)
+
+    # Save one frame, landmarks is an array with shape (21, 3) or None if there is no hand
+    def record(self, timestamp, landmarks=None, prediction=None):
+        entry = self._buffer[self._count]
+        entry["timestamp"] = timestamp
+        entry["hand"] = landmarks is not None
+        entry["prediction"] = self._label_codes.get(prediction, NO_PREDICTION)
+        if landmarks is not None:
+            entry["landmarks"] = landmarks
+        else:
+            entry["landmarks"] = 0
+
+        self._count += 1
+        self.records += 1
+        if self._count == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        self._handle.write(self._buffer[:self._count].tobytes())
+        self._handle.flush()
+        self._count = 0
+
+    def close(self):
+        if self._handle.closed:
+            return
+        self.flush()
+        self._handle.close()
+
+# Function to open a session file, the records are memory-mapped
+def load_session(path):
+    with open(path, "rb") as handle:
+        if handle.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"The file '{path}' is not a session file.")
+        header_length = struct.unpack("<I", handle.read(4))[0]
+        header = json.loads(handle.read(header_length))
+
+    # A record cut by a crash at the end of the file is ignored
+    offset = len(MAGIC) + 4 + header_length
+    count = (os.path.getsize(path) - offset) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return header["labels"], np.zeros(0, dtype=RECORD_DTYPE)
+    records = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=offset, shape=(count,))
+    return header["labels"], records
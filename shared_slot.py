@@ -0,0 +1,93 @@
+# Import libraries
+import features
+import numpy as np
+import session_log
+from multiprocessing import shared_memory
+
+# Layout of one slot: the latest result of a camera worker, written by one process and read by another
+SLOT_DTYPE = np.dtype([
+    ("sequence", "<u8"),
+    ("timestamp", "<f8"),
+    ("heartbeat", "<f8"),
+    ("hand", "u1"),
+    ("prediction", "<i2"),
+    ("confidence", "<f4"),
+    ("fps", "<f4"),
+    ("landmarks", "<f4", (features.NUM_LANDMARKS, 3))
+])
+
+# Class that shares the latest frame result over shared memory without locks
+# The writer makes "sequence" odd while it writes and even when it is done (seqlock),
+# the reader copies the slot and retries if the sequence changed meanwhile
+class LandmarkSlot:
+    def __init__(self, memory):
+        self.memory = memory
+        self._record = np.ndarray((), dtype=SLOT_DTYPE, buffer=memory.buf)
+        self._sequence = self._record["sequence"]
+
+    # Name used by other processes to attach to the slot
+    @property
+    def name(self):
+        return self.memory.name
+
+    @property
+    def sequence(self):
+        return int(self._sequence) // 2
+
+    # Time of the last write or beat, it is written outside the seqlock so it is read directly
+    @property
+    def heartbeat(self):
+        return float(self._record["heartbeat"])
+
+    # A worker that crashed while writing leaves the sequence odd
+    def reset(self):
+        if int(self._sequence) % 2:
+            self._sequence[...] = int(self._sequence) + 1
+
+    # Write the result of one frame, landmarks is a (21, 3) array or None
+    def write(self, timestamp, landmarks=None, prediction=session_log.NO_PREDICTION, confidence=0.0, fps=0.0):
+        record = self._record
+        self._sequence[...] = int(self._sequence) + 1
+        record["timestamp"] = timestamp
+        record["heartbeat"] = timestamp
+        record["hand"] = landmarks is not None
+        record["prediction"] = prediction
+        record["confidence"] = confidence
+        record["fps"] = fps
+        if landmarks is not None:
+            record["landmarks"] = landmarks
+        self._sequence[...] = int(self._sequence) + 1
+
+    # Only tell the coordinator that the worker is alive (no new frame)
+    def beat(self, timestamp):
+        self._record["heartbeat"] = timestamp
+
+    # Copy a consistent version of the slot, or None if the writer keeps changing it
+    def read(self, retries=100):
+        for _ in range(retries):
+            before = int(self._sequence)
+            if before % 2:
+                continue
+            record = self._record.copy()
+            if int(self._sequence) == before:
+                return record
+        return None
+
+    # Drop the views of the shared memory before closing it, the creator also unlinks it
+    def close(self, unlink=False):
+        self._record = None
+        self._sequence = None
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+# Function to create a new empty slot
+def create_slot():
+    memory = shared_memory.SharedMemory(create=True, size=SLOT_DTYPE.itemsize)
+    memory.buf[:SLOT_DTYPE.itemsize] = bytes(SLOT_DTYPE.itemsize)
+    return LandmarkSlot(memory)
+
+# Function to open a slot created by another process
+# Processes started by the creator share its resource tracker, so attaching does not change who unlinks it
+def attach_slot(name):
+    return LandmarkSlot(shared_memory.SharedMemory(name=name))
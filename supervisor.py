@@ -0,0 +1,285 @@
+# Import libraries
+import argparse
+import camera
+import multiprocessing
+import shared_slot
+import signal
+import time
+from gesture_control import GestureController, SendThrottle
+
+# Workers without a new frame or heartbeat for this long are restarted
+STALL_SECONDS = 5.0
+
+# Time given to a new worker to open its camera and warm up MediaPipe
+STARTUP_SECONDS = 30.0
+
+# Wait between restarts of a crashing worker
+MIN_RESTART_DELAY = 1.0
+MAX_RESTART_DELAY = 30.0
+
+# Worker process: one camera, its own MediaPipe Hands and model, results written to a shared memory slot
+def camera_worker(camera_index, slot_name, model_path, stop_event, adaptive=False, target_fps=30.0):
+    # Ctrl+C is handled by the supervisor, which stops the workers with stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    import capture
+    import cv2
+    import features
+    import hand_tracker
+    import numpy as np
+    import preprocess
+    import warmup
+
+    slot = shared_slot.attach_slot(slot_name)
+    slot.reset()
+
+    model_warmup = warmup.ModelWarmup(model_path).start()
+    cap = capture.FrameGrabber(camera_index, cv2.CAP_ANY).start()
+    classifier, hands = model_warmup.result()
+    codes = {label: code for code, label in enumerate(classifier.classes)}
+
+    tracker = hand_tracker.AdaptiveHandTracker(hands, target_fps=target_fps) if adaptive else None
+    preprocessor = preprocess.FramePreprocessor(flip_image=False)
+    landmarks = np.empty((features.NUM_LANDMARKS, 3), dtype=np.float64)
+    feature_vector = np.empty(classifier.n_features, dtype=np.float64)
+
+    fps = 0.0
+    last_frame_time = None
+    while not stop_event.is_set():
+        ret, frame = cap.read()
+        if not ret:
+            if cap.ended:
+                break
+            slot.beat(time.time())
+            continue
+
+        _, frame_rgb = preprocessor.process(frame)
+        if tracker is not None:
+            hand = tracker.process(frame_rgb)
+        else:
+            results = hands.process(frame_rgb)
+            hand = None
+            if results.multi_hand_landmarks:
+                hand = features.landmarks_to_array(results.multi_hand_landmarks[0], out=landmarks)
+
+        prediction, confidence = -1, 0.0
+        if hand is not None:
+            preprocessor.fix_landmarks(hand)
+            features.DEFAULT_FEATURES.compute(hand, out=feature_vector)
+            label, probabilities = classifier.predict(feature_vector)
+            prediction, confidence = codes[label], float(probabilities.max())
+
+        # Smoothed FPS of this worker
+        now = time.time()
+        if last_frame_time is not None and now > last_frame_time:
+            fps = 1.0 / (now - last_frame_time) if fps == 0.0 else 0.9 * fps + 0.1 / (now - last_frame_time)
+        last_frame_time = now
+        slot.write(now, hand, prediction, confidence, fps)
+
+    camera_ended = cap.ended
+    cap.release()
+    if tracker is not None:
+        tracker.close()
+    hands.close()
+    slot.close()
+
+    # A camera that stopped giving frames is a failure, the supervisor starts the worker again
+    if camera_ended and not stop_event.is_set():
+        raise SystemExit(1)
+
+# Class with the process, slot and restart state of one camera
+class WorkerHandle:
+    def __init__(self, camera_index):
+        self.camera_index = camera_index
+        self.slot = shared_slot.create_slot()
+        self.process = None
+        self.started = 0.0
+        self.restarts = 0
+        self.restart_delay = MIN_RESTART_DELAY
+        self.next_start = 0.0
+        self.last_sequence = 0
+        self.frames = 0
+        self.hands = 0
+        self.fps = 0.0
+
+# Class that runs one worker process per camera and merges their predictions into one color
+class Supervisor:
+    def __init__(self, camera_indexes, model_path, labels, color_sender, controller, throttle,
+                 adaptive=False, target_fps=30.0):
+        self.context = multiprocessing.get_context("spawn")
+        self.stop_event = self.context.Event()
+        self.model_path = model_path
+        self.labels = list(labels)
+        self.color_sender = color_sender
+        self.controller = controller
+        self.throttle = throttle
+        self.adaptive = adaptive
+        self.target_fps = target_fps
+        self.workers = [WorkerHandle(camera_index) for camera_index in camera_indexes]
+
+    def _start_worker(self, worker):
+        worker.process = self.context.Process(
+            target=camera_worker,
+            args=(worker.camera_index, worker.slot.name, self.model_path, self.stop_event,
+                  self.adaptive, self.target_fps),
+            name=f"camera-{worker.camera_index}",
+            daemon=True
+        )
+        worker.process.start()
+        worker.started = time.time()
+
+    # Restart dead or stalled workers, waiting longer after every failure
+    def _check_worker(self, worker, now):
+        if worker.process is None:
+            if now >= worker.next_start:
+                self._start_worker(worker)
+            return
+
+        heartbeat = max(worker.slot.heartbeat, worker.started)
+        stalled = worker.process.is_alive() and now - heartbeat > (
+            STALL_SECONDS if heartbeat > worker.started else STARTUP_SECONDS)
+        if worker.process.is_alive() and not stalled:
+            if now - worker.started > STARTUP_SECONDS:
+                worker.restart_delay = MIN_RESTART_DELAY
+            return
+
+        if stalled:
+            print(f"⚠️ Camera {worker.camera_index} stalled, restarting its worker.")
+            worker.process.terminate()
+        else:
+            print(f"⚠️ Worker of camera {worker.camera_index} exited with code {worker.process.exitcode}, "
+                  f"restarting in {worker.restart_delay:.0f} s.")
+        worker.process.join(timeout=1.0)
+        worker.process = None
+
+        # A worker killed in the middle of a write leaves the slot unreadable until it is reset
+        worker.slot.reset()
+        worker.restarts += 1
+        worker.next_start = now + worker.restart_delay
+        worker.restart_delay = min(MAX_RESTART_DELAY, worker.restart_delay * 2)
+
+    # Read the new frames of every camera, the most confident hand drives the gesture logic
+    def _merge_predictions(self):
+        best = None
+        for worker in self.workers:
+            # None while a worker is writing or after it died in the middle of a write
+            record = worker.slot.read()
+            if record is None:
+                continue
+            sequence = int(record["sequence"]) // 2
+            if sequence == worker.last_sequence:
+                continue
+            worker.frames += sequence - worker.last_sequence if sequence > worker.last_sequence else 1
+            worker.last_sequence = sequence
+            worker.fps = float(record["fps"])
+
+            if record["hand"] and record["prediction"] >= 0:
+                worker.hands += 1
+                if best is None or record["confidence"] > best["confidence"]:
+                    best = record
+
+        if best is not None:
+            self.controller.update(self.labels[int(best["prediction"])], float(best["timestamp"]),
+                                   float(best["confidence"]))
+
+    def report(self):
+        for worker in self.workers:
+            alive = worker.process is not None and worker.process.is_alive()
+            print(f"Camera {worker.camera_index}: {'running' if alive else 'stopped'}, {worker.fps:.1f} FPS, "
+                  f"{worker.frames} frames, {worker.hands} with a hand, {worker.restarts} restarts")
+
+    # Coordinator loop, runs until stop() is called
+    def run(self, poll_interval=0.005, report_interval=10.0):
+        next_report = time.time() + report_interval
+        while not self.stop_event.is_set():
+            now = time.time()
+            for worker in self.workers:
+                self._check_worker(worker, now)
+
+            self._merge_predictions()
+            hex_color = self.controller.hex_color
+            if self.throttle.should_send(hex_color, now):
+                self.color_sender.send(hex_color)
+
+            if report_interval and now >= next_report:
+                self.report()
+                next_report = now + report_interval
+            self.stop_event.wait(poll_interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+    # Wait for the workers to finish and free the shared memory
+    def close(self, timeout=3.0):
+        self.stop_event.set()
+        deadline = time.time() + timeout
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout=max(0.0, deadline - time.time()))
+                if worker.process.is_alive():
+                    worker.process.terminate()
+                    worker.process.join(timeout=1.0)
+        for worker in self.workers:
+            worker.slot.close(unlink=True)
+
+# Main code
+if __name__ == "__main__":
+    import detection
+    import warmup
+
+    parser = argparse.ArgumentParser(description="Control an RGB LED with hand gestures from several cameras at once.")
+    parser.add_argument("--cameras", type=int, nargs="+", help="Camera indexes, by default every camera found")
+    parser.add_argument("--devices", metavar="FILE", help="Send the color to every board of this registry (JSON)")
+    parser.add_argument("--udp", action="store_true", help="Send binary UDP datagrams to the ESP32 instead of HTTP")
+    parser.add_argument("--adaptive", action="store_true", help="Track the hand in a downscaled region of interest")
+    parser.add_argument("--target-fps", type=float, default=30.0, help="FPS kept by the adaptive mode")
+    parser.add_argument("--report-interval", type=float, default=10.0, help="Seconds between status reports")
+    args = parser.parse_args()
+
+    model_path = warmup.find_model_path()
+    if model_path is None:
+        print(f"Error: The model file '{warmup.MODEL_PATHS[-1]}' was not found.")
+        print(f"Please execute 'train_model.py' first to train and save the model.")
+        exit()
+
+    camera_indexes = args.cameras
+    if camera_indexes is None:
+        camera_indexes = [index for index, _ in camera.get_camera_info()]
+    if not camera_indexes:
+        print("No camera found!")
+        exit()
+
+    # Only the labels are needed here, every worker loads its own model
+    import inference
+    labels = inference.load_classifier(model_path).classes
+
+    # Same sending options as detection.py
+    if args.devices:
+        import devices
+        import fanout_sender
+        color_sender = fanout_sender.FanoutSender(devices.load_devices(args.devices))
+    elif args.udp:
+        import color_protocol
+        color_sender = color_protocol.UdpColorSender(detection.ESP32_IP, color_protocol.DEFAULT_PORT)
+    else:
+        color_sender = detection.color_sender
+
+    supervisor = Supervisor(
+        camera_indexes, model_path, labels, color_sender,
+        GestureController(2, vote_seconds=0.3, ramp_rate=30.0), SendThrottle(0.1),
+        adaptive=args.adaptive, target_fps=args.target_fps
+    )
+
+    def request_stop(signum, _):
+        print(f"Received signal {signum}, stopping...")
+        supervisor.stop()
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    print(f"Starting {len(camera_indexes)} camera workers: {camera_indexes}")
+    supervisor.run(report_interval=args.report_interval)
+
+    supervisor.close()
+    supervisor.report()
+    color_sender.send("#000000")
+    color_sender.close()
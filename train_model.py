@@ -1,45 +1,268 @@
 # Import libraries
+import argparse
+import dataset_store
+import io
 import joblib
+import numpy as np
 import os
-import pandas as pd
-from sklearn.ensemble import GradientBoostingClassifier
+import time
+import tree_runtime
+from concurrent.futures import ProcessPoolExecutor
+from features import FEATURE_COLUMNS
+from inference import GestureClassifier
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.tree import DecisionTreeClassifier
 
-# Function to train and save the model
-def train_model(dataset_path, model_output_path):
-    # Load dataset and import it to a DataFrame
-    print("Loading dataset...")
-    df = pd.read_csv(dataset_path)
+# Candidate model families and hyperparameters evaluated by the search mode
+CANDIDATES = [
+    ("GradientBoosting", GradientBoostingClassifier, {}),
+    ("GradientBoosting", GradientBoostingClassifier, {"n_estimators": 50, "max_depth": 3}),
+    ("GradientBoosting", GradientBoostingClassifier, {"n_estimators": 200, "max_depth": 2}),
+    ("RandomForest", RandomForestClassifier, {"n_estimators": 50, "max_depth": 12}),
+    ("RandomForest", RandomForestClassifier, {"n_estimators": 200}),
+    ("ExtraTrees", ExtraTreesClassifier, {"n_estimators": 100}),
+    ("DecisionTree", DecisionTreeClassifier, {"max_depth": 10}),
+    ("KNeighbors", KNeighborsClassifier, {"n_neighbors": 5}),
+    ("LogisticRegression", LogisticRegression, {"max_iter": 1000})
+]
+
+# Models that can add estimators trained only on new samples (warm start)
+INCREMENTAL_MODELS = (GradientBoostingClassifier, RandomForestClassifier, ExtraTreesClassifier)
+
+# Function to save a trained model and its NumPy version
+# Files are written next to the old ones and swapped in, so a running detection.py never reads half a file
+def save_model(model, model_output_path, compiled_output_path=None):
+    joblib.dump(model, model_output_path + ".tmp")
+    os.replace(model_output_path + ".tmp", model_output_path)
+    print(f"Model saved on: {model_output_path}")
 
-    # Separate characteristics from labels
-    X = df[[
-        "WRIST_X", "WRIST_Y",
-        "THUMB_TIP_X", "THUMB_TIP_Y",
-        "INDEX_TIP_X", "INDEX_TIP_Y",
-        "MIDDLE_TIP_X", "MIDDLE_TIP_Y"
-    ]]
-    Y = df["label"]
+    if not compiled_output_path:
+        return
 
+    # Only gradient boosting models can be exported, remove an old export so it is not loaded instead
+    if isinstance(model, GradientBoostingClassifier):
+        with open(compiled_output_path + ".tmp", "wb") as handle:
+            tree_runtime.export_model(model, handle, FEATURE_COLUMNS)
+        os.replace(compiled_output_path + ".tmp", compiled_output_path)
+        print(f"Compiled model saved on: {compiled_output_path}")
+    elif os.path.exists(compiled_output_path):
+        os.remove(compiled_output_path)
+        print(f"Removed old compiled model: {compiled_output_path}")
+
+# Function to train and save the model
+def train_model(dataset_path, model_output_path, compiled_output_path=None):
+    # Load dataset, a binary store is memory-mapped instead of parsed
+    print(f"Loading dataset from {dataset_path}...")
+    X, Y = dataset_store.load_dataset(dataset_path, FEATURE_COLUMNS)
 
     # Train model using GradientBoosting
     print("Training model using GradientBoostingClassifier...")
     model = GradientBoostingClassifier()
     model.fit(X, Y)
     print("¡Model trained successfully!")
+    mark_trained_rows(model, dataset_path, len(X))
 
     # Save trained model
-    joblib.dump(model, model_output_path)
-    print(f"Model saved on: {model_output_path}")
+    save_model(model, model_output_path, compiled_output_path)
+
+# Save in the model which rows of the store it has seen, "train_model.py --update" only uses the next ones
+def mark_trained_rows(model, dataset_path, rows):
+    if os.path.isdir(dataset_path):
+        model.trained_store_ = dataset_store.read_meta(dataset_path).get("id")
+        model.trained_rows_ = rows
+
+# Function to add the new samples to the store and update the model with them, without a full retrain
+def update_model(store_path, model_output_path, compiled_output_path=None, new_files=(),
+                 extra_estimators=20, rehearsal=50, seed=0):
+    if not os.path.isdir(store_path):
+        print(f"Error: The dataset store '{store_path}' was not found. Execute 'merge_dataset.py' first.")
+        return None
+    if not os.path.exists(model_output_path):
+        print(f"Error: The model file '{model_output_path}' was not found. Train it first without --update.")
+        return None
+
+    model = joblib.load(model_output_path)
+    if not isinstance(model, INCREMENTAL_MODELS):
+        print(f"Error: {type(model).__name__} can not be updated, train it again without --update.")
+        return None
+
+    # Append the new label files to the store
+    appender = dataset_store.StoreAppender(store_path)
+    first_new_row = appender.first_row
+    for file_path in new_files:
+        added = 0
+        for samples, labels in dataset_store.read_csv_chunks(file_path, FEATURE_COLUMNS):
+            added += appender.write(samples, labels)
+        print(f"{file_path}: {added} new rows")
+    appender.close()
+
+    # Rows after the last training, only known if the store was not rebuilt since then
+    meta = dataset_store.read_meta(store_path)
+    if getattr(model, "trained_store_", None) == meta.get("id"):
+        first_new_row = min(first_new_row, model.trained_rows_)
+    samples, codes, label_names, columns = dataset_store.load_store(store_path)
+    if columns != list(FEATURE_COLUMNS):
+        print(f"Error: The store has the columns {columns} but {list(FEATURE_COLUMNS)} were expected.")
+        return None
+    label_names = np.asarray(label_names, dtype=object)
+    new_rows = np.arange(first_new_row, meta["rows"])
+    if len(new_rows) == 0:
+        print("There are no new samples since the last training.")
+        return None
+
+    # The gestures of the model can not change without a full retrain
+    new_labels = set(label_names[np.unique(codes[new_rows])]) - set(model.classes_)
+    if new_labels:
+        print(f"Error: New gestures {sorted(new_labels)} need a full retrain without --update.")
+        return None
+
+    # A few old samples of every gesture keep the new estimators from forgetting them, the cost does not grow
+    rng = np.random.default_rng(seed)
+    old_codes = np.asarray(codes[:first_new_row])
+    rehearsal_rows = [
+        rng.choice(rows, min(rehearsal, len(rows)), replace=False)
+        for rows in (np.flatnonzero(old_codes == code) for code in range(len(label_names)))
+        if len(rows)
+    ]
+    rows = np.sort(np.concatenate([new_rows, *rehearsal_rows]))
+    X, Y = np.asarray(samples[rows]), label_names[codes[rows]]
+    if set(Y) != set(model.classes_):
+        print(f"Error: The update needs samples of every gesture {list(model.classes_)}, train it without --update.")
+        return None
+
+    # Warm start: the old estimators are kept and the new ones only see these samples
+    start = time.perf_counter()
+    model.set_params(warm_start=True, n_estimators=model.n_estimators + extra_estimators)
+    model.fit(X, Y)
+    model.set_params(warm_start=False)
+    mark_trained_rows(model, store_path, meta["rows"])
+    print(f"Model updated with {len(new_rows)} new and {len(rows) - len(new_rows)} old samples "
+          f"in {time.perf_counter() - start:.2f} s ({model.n_estimators} estimators).")
+
+    save_model(model, model_output_path, compiled_output_path)
+    return model
+
+# Cross-validate and fit one candidate, runs inside a worker process
+def _evaluate_candidate(dataset_path, name, estimator_class, params, folds):
+    X, Y = dataset_store.load_dataset(dataset_path, FEATURE_COLUMNS)
+    X = np.asarray(X)
+
+    start = time.perf_counter()
+    scores = cross_val_score(
+        estimator_class(**params), X, Y,
+        cv=StratifiedKFold(n_splits=folds, shuffle=True, random_state=0)
+    )
+    model = estimator_class(**params).fit(X, Y)
+    return {
+        "name": name,
+        "params": params,
+        "accuracy": float(scores.mean()),
+        "accuracy_std": float(scores.std()),
+        "train_seconds": time.perf_counter() - start,
+        "model": model
+    }
+
+# Measure the single-sample latency with the same path detection.py uses
+def measure_latency(model, sample, repeats=200):
+    if isinstance(model, GradientBoostingClassifier):
+        buffer = io.BytesIO()
+        tree_runtime.export_model(model, buffer, FEATURE_COLUMNS)
+        buffer.seek(0)
+        classifier = tree_runtime.load_compiled(buffer)
+    else:
+        classifier = GestureClassifier(model)
+
+    # Warm up, then keep the median
+    for _ in range(10):
+        classifier.predict(sample)
+    times = np.empty(repeats)
+    for index in range(repeats):
+        start = time.perf_counter()
+        classifier.predict(sample)
+        times[index] = time.perf_counter() - start
+    return float(np.median(times))
+
+# Get the size of the saved model file
+def artifact_size(model):
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    return buffer.getbuffer().nbytes
+
+# Function to evaluate every candidate in parallel and save the most accurate one within the latency budget
+def search_models(dataset_path, model_output_path, compiled_output_path=None,
+                  latency_budget_ms=2.0, folds=5, workers=None):
+    print(f"Loading dataset from {dataset_path}...")
+    X, _ = dataset_store.load_dataset(dataset_path, FEATURE_COLUMNS)
+    sample = np.asarray(X[0], dtype=np.float64)
+
+    # Cross-validation of every candidate runs on its own process
+    print(f"Evaluating {len(CANDIDATES)} candidates with {folds}-fold cross-validation...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_evaluate_candidate, dataset_path, name, estimator_class, params, folds)
+            for name, estimator_class, params in CANDIDATES
+        ]
+        # Kept in the order of CANDIDATES, not the order the processes finish
+        results = [future.result() for future in futures]
+
+    # Latency is measured here, one model at a time, so the workers do not disturb it
+    for result in results:
+        result["latency_ms"] = measure_latency(result["model"], sample) * 1000
+        result["size_kb"] = artifact_size(result["model"]) / 1024
+
+    # Show results sorted by accuracy, ties go to the faster model (then to the first candidate)
+    results.sort(key=lambda result: (-result["accuracy"], result["latency_ms"]))
+    print(f"{'Model':<20}{'Params':<40}{'Accuracy':>10}{'Latency':>12}{'Size':>12}")
+    for result in results:
+        within = "" if result["latency_ms"] <= latency_budget_ms else "  (over budget)"
+        print(f"{result['name']:<20}{str(result['params']):<40}{result['accuracy']:>10.4f}"
+              f"{result['latency_ms']:>9.3f} ms{result['size_kb']:>9.0f} KB{within}")
+
+    # Most accurate model that fits the per-frame budget
+    allowed = [result for result in results if result["latency_ms"] <= latency_budget_ms]
+    if not allowed:
+        print(f"Error: No model predicts within {latency_budget_ms} ms. Nothing was saved.")
+        return None
+
+    best = allowed[0]
+    print(f"Selected {best['name']} {best['params']} (accuracy {best['accuracy']:.4f}, "
+          f"latency {best['latency_ms']:.3f} ms)")
+    mark_trained_rows(best["model"], dataset_path, len(X))
+    save_model(best["model"], model_output_path, compiled_output_path)
+    return best
 
 # Main to execute and save the model
 if __name__ == "__main__":
-    # Constants to get the dataset and path to save trained model
-    dataset_file = os.path.expanduser("gestures_dataset.csv")
+    parser = argparse.ArgumentParser(description="Train the gesture model.")
+    parser.add_argument("--search", action="store_true", help="Evaluate several models and keep the best one")
+    parser.add_argument("--latency-budget-ms", type=float, default=2.0, help="Maximum single-sample predict time")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--update", nargs="*", metavar="CSV",
+                        help="Add these label files to the store and update the model only with the new samples")
+    parser.add_argument("--extra-estimators", type=int, default=20, help="Estimators added by --update")
+    parser.add_argument("--rehearsal", type=int, default=50, help="Old samples of every gesture used by --update")
+    args = parser.parse_args()
+
+    # Constants to get the dataset and path to save trained model, the store from merge_dataset.py is preferred
+    dataset_file = "gestures_dataset_store"
+    if not os.path.exists(dataset_file):
+        dataset_file = os.path.expanduser("gestures_dataset.csv")
     model_file = "gesture_model.joblib"
+    compiled_model_file = "gesture_model.npz"
 
     # Verify the dataset exists
-    if not os.path.exists(dataset_file):
+    if args.update is not None:
+        update_model("gestures_dataset_store", model_file, compiled_model_file, args.update,
+                     args.extra_estimators, args.rehearsal)
+    elif not os.path.exists(dataset_file):
         print(f"Error: The dataset file '{dataset_file}' was not found.")
         print(f"Verify the correct path of the file '{dataset_file}'.")
+    elif args.search:
+        search_models(dataset_file, model_file, compiled_model_file,
+                      args.latency_budget_ms, args.folds, args.workers)
     else:
-        train_model(dataset_file, model_file)
-        
\ No newline at end of file
+        train_model(dataset_file, model_file, compiled_model_file)
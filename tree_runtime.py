@@ -0,0 +1,149 @@
+# Import libraries
+import json
+import numpy as np
+
+# Flatten a trained GradientBoostingClassifier into plain NumPy node arrays
+def export_model(model, output_path, columns=None):
+    # Column order of the model
+    if columns is None:
+        columns = list(getattr(model, "feature_names_in_", []))
+
+    # Every stage has one regression tree per class (only one for binary problems)
+    n_stages, n_trees_per_stage = model.estimators_.shape
+    learning_rate = model.learning_rate
+
+    features, thresholds, lefts, rights, values = [], [], [], [], []
+    roots = np.empty((n_stages, n_trees_per_stage), dtype=np.int32)
+    offset = 0
+    max_depth = 0
+    for stage in range(n_stages):
+        for k in range(n_trees_per_stage):
+            tree = model.estimators_[stage, k].tree_
+            node_ids = np.arange(tree.node_count, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            # Leaves point to themselves so the traversal can run a fixed number of steps
+            left = np.where(is_leaf, node_ids, tree.children_left) + offset
+            right = np.where(is_leaf, node_ids, tree.children_right) + offset
+
+            features.append(np.where(is_leaf, 0, tree.feature).astype(np.int32))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(left.astype(np.int32))
+            rights.append(right.astype(np.int32))
+            values.append(tree.value[:, 0, 0] * learning_rate)
+
+            roots[stage, k] = offset
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+    # Raw prediction of the initial estimator, it is the same for every sample
+    init_raw = model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0]
+
+    np.savez_compressed(
+        output_path,
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        left=np.concatenate(lefts),
+        right=np.concatenate(rights),
+        value=np.concatenate(values),
+        roots=roots,
+        init_raw=np.asarray(init_raw, dtype=np.float64),
+        max_depth=np.int32(max_depth),
+        classes=np.asarray(model.classes_).astype(str),
+        columns=np.asarray(json.dumps(list(columns)))
+    )
+
+# Class that scores samples with the exported arrays, only needs NumPy
+class CompiledEnsemble:
+    def __init__(self, arrays):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.init_raw = arrays["init_raw"]
+        self.max_depth = int(arrays["max_depth"])
+        self.classes = arrays["classes"].astype(object)
+        self.columns = json.loads(str(arrays["columns"]))
+        self.n_features = len(self.columns)
+
+        self.n_stages, self.n_trees_per_stage = self.roots.shape
+        self._flat_roots = self.roots.ravel()
+
+    # Get the raw score of every class for samples with shape (n_samples, n_features)
+    def decision_function(self, features):
+        # sklearn compares the features as float32 against float64 thresholds
+        features = np.asarray(features, dtype=np.float32).reshape(-1, self.n_features)
+        n_samples = features.shape[0]
+        rows = np.arange(n_samples)[:, None]
+
+        # Walk every tree for every sample at the same time
+        nodes = np.broadcast_to(self._flat_roots, (n_samples, self._flat_roots.size))
+        for _ in range(self.max_depth):
+            go_left = features[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        leaf_values = self.value[nodes].reshape(n_samples, self.n_stages, self.n_trees_per_stage)
+        return self.init_raw + leaf_values.sum(axis=1)
+
+    # Get the probability of every class
+    def predict_proba(self, features):
+        raw = self.decision_function(features)
+
+        # Binary problems keep one score, multiclass problems use softmax
+        if self.n_trees_per_stage == 1:
+            positive = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        raw = raw - raw.max(axis=1, keepdims=True)
+        exp = np.exp(raw)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    # Predict one sample, returns the label and the probability of each class
+    def predict(self, features):
+        probabilities = self.predict_proba(features)[0]
+        return self.classes[probabilities.argmax()], probabilities
+
+    # Predict a batch of samples with shape (n_samples, n_features)
+    def predict_batch(self, features):
+        probabilities = self.predict_proba(features)
+        return self.classes[probabilities.argmax(axis=1)], probabilities
+
+# Function to load an exported model
+def load_compiled(model_path):
+    with np.load(model_path) as arrays:
+        return CompiledEnsemble({key: arrays[key] for key in arrays.files})
+
+# Export the trained model and verify it against sklearn
+if __name__ == "__main__":
+    import argparse
+    import joblib
+    import pandas as pd
+    import time
+
+    parser = argparse.ArgumentParser(description="Export gesture_model.joblib to NumPy node arrays.")
+    parser.add_argument("--model", default="gesture_model.joblib")
+    parser.add_argument("--output", default="gesture_model.npz")
+    parser.add_argument("--dataset", default="gestures_dataset.csv")
+    args = parser.parse_args()
+
+    # Export, models trained on NumPy arrays have no column names and use the default features
+    from features import FEATURE_COLUMNS
+    model = joblib.load(args.model)
+    export_model(model, args.output, list(getattr(model, "feature_names_in_", FEATURE_COLUMNS)))
+    compiled = load_compiled(args.output)
+    print(f"Model exported to: {args.output} ({compiled.feature.size} nodes)")
+
+    # Compare predictions with sklearn on the dataset
+    samples = pd.read_csv(args.dataset)[compiled.columns]
+    expected = model.predict(samples)
+
+    start = time.perf_counter()
+    labels, _ = compiled.predict_batch(samples.to_numpy())
+    batch_time = time.perf_counter() - start
+
+    mismatches = int((labels != expected).sum())
+    print(f"Mismatches against sklearn: {mismatches} of {len(samples)}")
+    print(f"Batch time: {batch_time * 1e6 / len(samples):.1f} us/sample")
+    if mismatches:
+        exit(1)
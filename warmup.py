@@ -0,0 +1,70 @@
+# Import libraries
+import numpy as np
+import os
+import threading
+import time
+
+# Model files, the exported NumPy version does not need sklearn
+MODEL_PATHS = ["gesture_model.npz", "gesture_model.joblib"]
+
+# Function to find the model file to load
+def find_model_path(model_paths=MODEL_PATHS):
+    for model_path in model_paths:
+        if os.path.exists(model_path):
+            return model_path
+    return None
+
+# Class that imports, loads and warms up the model and MediaPipe on a background thread
+class ModelWarmup:
+    def __init__(self, model_path, frame_size=(480, 640), **hands_options):
+        self.model_path = model_path
+        self.frame_size = frame_size
+        self.hands_options = hands_options or {
+            "static_image_mode": False,
+            "max_num_hands": 1,
+            "min_detection_confidence": 0.5
+        }
+
+        self.classifier = None
+        self.hands = None
+        self.timings = {}
+        self._error = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="ModelWarmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            # Heavy imports
+            start = time.perf_counter()
+            import inference
+            import mediapipe as mp
+            self.timings["imports"] = time.perf_counter() - start
+
+            # Load the model and run one prediction so lazy initialization happens here
+            start = time.perf_counter()
+            classifier = inference.load_classifier(self.model_path)
+            classifier.predict(np.zeros(classifier.n_features, dtype=np.float64))
+            self.timings["model"] = time.perf_counter() - start
+
+            # Build the MediaPipe graph and process a dummy frame
+            start = time.perf_counter()
+            hands = mp.solutions.hands.Hands(**self.hands_options)
+            hands.process(np.zeros((*self.frame_size, 3), dtype=np.uint8))
+            self.timings["mediapipe"] = time.perf_counter() - start
+
+            self.classifier = classifier
+            self.hands = hands
+        except Exception as e:
+            self._error = e
+
+    # Wait until the warm-up finishes and get the classifier and the Hands instance
+    def result(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        if self._error is not None:
+            raise self._error
+        return self.classifier, self.hands